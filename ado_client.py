@@ -0,0 +1,227 @@
+import asyncio
+import base64
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuses ADO uses to shed load; these shrink the concurrency window
+THROTTLE_STATUSES = {429, 503}
+# Transient statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class AdoClient:
+    """Shared throttle-aware Azure DevOps REST client.
+
+    Requests run on a private asyncio event loop. The number of requests in
+    flight follows AIMD: each success widens the window by roughly one request
+    per round trip, and every throttle signal (429/503, Retry-After, a delayed
+    or nearly exhausted X-RateLimit-* budget) halves it. Server back-off is
+    honored globally, so all workers pause together instead of hammering ADO.
+    """
+
+    def __init__(self, pat: str, max_concurrency: int = 32, initial_concurrency: int = 8,
+                 min_concurrency: int = 1, max_retries: int = 5, backoff: float = 1.0,
+                 timeout: float = 60):
+        auth = base64.b64encode(f":{pat}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {auth}"}
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        self.stats = {
+            'requests': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'retries': 0,
+            'throttled': 0,
+            'rate_limit_warnings': 0,
+            'backoff_seconds': 0.0,
+            'bytes': 0,
+        }
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ado")
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._condition = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the client's event loop thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name="ado-client-loop", daemon=True)
+                thread.start()
+                self._condition = asyncio.run_coroutine_threadsafe(self._create_condition(), self._loop).result()
+            return self._loop
+
+    async def _create_condition(self) -> asyncio.Condition:
+        return asyncio.Condition()
+
+    async def _acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(int(self.limit), self.min_concurrency))
+            self.in_flight += 1
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        """Additive increase: about one extra slot per window's worth of successes"""
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def _decrease(self) -> None:
+        """Multiplicative decrease, at most once per second so one burst of 429s counts once"""
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(float(self.min_concurrency), self.limit / 2)
+            self._last_decrease = now
+
+    def _block_for(self, seconds: float) -> None:
+        """Pause every request until the server's back-off has elapsed"""
+        if seconds > 0:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.stats['backoff_seconds'] += seconds
+
+    def _server_delay(self, response: requests.Response) -> Optional[float]:
+        """Seconds the server asked us to wait, if any"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset:
+            try:
+                if float(remaining) <= 0:
+                    return max(0.0, float(reset) - time.time())
+            except ValueError:
+                pass
+        return None
+
+    def _near_rate_limit(self, response: requests.Response) -> bool:
+        """Whether ADO reports that this request was delayed or the budget is nearly spent"""
+        if response.headers.get("X-RateLimit-Delay"):
+            return True
+        try:
+            remaining = float(response.headers.get("X-RateLimit-Remaining", ""))
+            limit = float(response.headers.get("X-RateLimit-Limit", ""))
+            return limit > 0 and remaining / limit < 0.1
+        except ValueError:
+            return False
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying throttled and transient failures with back-off"""
+        kwargs.setdefault("timeout", self.timeout)
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await self._acquire()
+            try:
+                self.stats['requests'] += 1
+                response = await loop.run_in_executor(
+                    self._executor, lambda: self.session.request(method, url, **kwargs)
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    self.stats['failed'] += 1
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+                continue
+            finally:
+                await self._release()
+
+            server_delay = self._server_delay(response)
+
+            if response.status_code in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                self._decrease()
+                self._block_for(server_delay if server_delay is not None else self.backoff * (2 ** attempt))
+            elif self._near_rate_limit(response) or server_delay:
+                self.stats['rate_limit_warnings'] += 1
+                self._decrease()
+                if server_delay:
+                    self._block_for(server_delay)
+            elif response.ok:
+                self._increase()
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self.stats['retries'] += 1
+                if response.status_code not in THROTTLE_STATUSES:
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+                continue
+
+            if response.ok:
+                self.stats['succeeded'] += 1
+                if not kwargs.get("stream"):
+                    self.stats['bytes'] += len(response.content)
+            else:
+                self.stats['failed'] += 1
+            return response
+
+    async def get_json(self, url: str, **kwargs) -> Dict:
+        """GET a URL and return its JSON body, raising for HTTP errors"""
+        response = await self.request("GET", url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop from synchronous code"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def submit_all(self, func: Callable, items: Iterable) -> Dict[Future, object]:
+        """Start the coroutine func(item) for every item as soon as it is drawn from items"""
+        loop = self._ensure_loop()
+        return {asyncio.run_coroutine_threadsafe(func(item), loop): item for item in items}
+
+    def iter_completed(self, futures: Dict[Future, object]):
+        """Yield (item, result, error) for submitted work as each completes"""
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+
+    def print_stats(self) -> None:
+        """Print request and throttling counters"""
+        print(f"   • ADO requests: {self.stats['requests']} "
+              f"(ok: {self.stats['succeeded']}, failed: {self.stats['failed']}, retries: {self.stats['retries']})")
+        print(f"   • Throttled: {self.stats['throttled']} | "
+              f"Rate-limit warnings: {self.stats['rate_limit_warnings']} | "
+              f"Back-off: {self.stats['backoff_seconds']:.1f}s")
+        print(f"   • Concurrency window: {self.limit:.1f} (max {self.max_concurrency})")
+
+    def close(self) -> None:
+        """Stop the event loop and release pooled connections"""
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+        self._executor.shutdown(wait=False)
+        self.session.close()
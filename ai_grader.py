@@ -399,27 +399,21 @@ class AKSResponseTester:
     def generate_ai_response(self, question: str, context: str = "") -> Optional[str]:
         """Generate AI response using the AKS assistant"""
         try:
-            # Create a temporary thread for this question
-            thread = self.aks_assistant.client.beta.threads.create(
-                tool_resources={
-                    "file_search": {
-                        "vector_store_ids": [self.aks_assistant.vector_store_id]
-                    }
-                }
-            )
+            # Lease a temporary thread for this question (pre-created with the vector store attached)
+            thread_id = self.aks_assistant.lease_thread("generate_ai_response")
             
             # Add the question with context
             full_question = f"{question}\n\nContext: {context}" if context else question
             
             self.aks_assistant.client.beta.threads.messages.create(
-                thread_id=thread.id,
+                thread_id=thread_id,
                 role="user",
                 content=full_question
             )
             
             # Run the assistant
             run = self.aks_assistant.client.beta.threads.runs.create_and_poll(
-                thread_id=thread.id,
+                thread_id=thread_id,
                 assistant_id=self.aks_assistant.assistant_id,
                 instructions="""You are an expert in AKS (Azure Kubernetes Service) support. 
                 Provide a comprehensive, technically accurate response to this customer question.
@@ -431,7 +425,7 @@ class AKSResponseTester:
             
             if run.status == 'completed':
                 # Get the latest assistant message
-                messages = self.aks_assistant.client.beta.threads.messages.list(thread_id=thread.id)
+                messages = self.aks_assistant.client.beta.threads.messages.list(thread_id=thread_id)
                 
                 for message in messages:
                     if message.role == "assistant":
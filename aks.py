@@ -8,27 +8,71 @@ import argparse
 import urllib.parse
 import re
 from openai import AzureOpenAI
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import time
-import base64
 import requests
 import hashlib
+import mmap
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from ai_grader import AIResponseGrader, AKSResponseTester
+from ado_client import AdoClient
+from identity_cache import IDENTITY_CACHE_FILE, IdentityCache
+from vector_store_uploader import VectorStoreUploader
+from wiki_sections import SECTION_SPLIT_THRESHOLD, section_filename, split_page_link, split_sections
+from wiki_dedup import DuplicateIndex, fingerprint
+from file_name_cache import FileNameCache
+from session_threads import SessionThreads
+from warm_threads import WarmThreadPool
+from wiki_catalog import (ASSISTANT, CATALOG_FILE, TEST_ASSISTANT, TEST_VECTOR_STORE, VECTOR_STORE,
+                          DownloadProgress, WikiCatalog)
 from azure.ai.agents.models import BingGroundingTool
 
+try:
+    import ijson
+except ImportError:  # Optional: without it the page tree is parsed in one piece
+    ijson = None
+
 # Configuration
-VECTOR_STORE_FILE = "vector_store_id.json"
-ASSISTANT_ID_FILE = "assistant_id.json"
 SUPPORTED_FORMATS = {".md", ".txt", ".json", ".yaml", ".yml"}
-WIKI_URL_MAPPING_FILE = "wiki_url_mapping.json"
 # Remove line 22 and replace lines 15-22 with:
 from azure.ai.agents.models import BingGroundingTool
 
 # Configuration
-VECTOR_STORE_FILE = "vector_store_id.json"
-ASSISTANT_ID_FILE = "assistant_id.json"
 SUPPORTED_FORMATS = {".md", ".txt", ".json", ".yaml", ".yml"}
-WIKI_URL_MAPPING_FILE = "wiki_url_mapping.json"
+# Resource IDs, download progress, the vector store manifest and page URLs live in
+# a SQLite catalog next to this file (the JSON files it replaces are imported)
+CATALOG_DIR = os.path.dirname(os.path.abspath(__file__))
+# Session of the interactive CLI, which keeps one conversation going
+CLI_SESSION = "cli"
+
+# Mentions of ADO users in wiki markdown: @<GUID>
+ADO_USER_GUID_PATTERN = re.compile(r'@<([A-F0-9]{8}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{12})>', re.IGNORECASE)
+# GUIDs per identities API call (keeps the query string well under URL limits)
+ADO_IDENTITY_BATCH_SIZE = 100
+
+# Concurrent ADO page fetches to start with (the client widens the window as requests succeed)
+ADO_FETCH_WORKERS = 8
+# Upper bound on concurrent ADO page fetches (the client backs off below this on throttling)
+ADO_MAX_FETCH_WORKERS = 32
+
+# First bytes of every downloaded page (followed by the page URL and a blank line)
+PAGE_HEADER_PREFIX = b"[View this page online]("
+
+# Vector store manifest (catalog uploads table):
+# relative path -> {"hash": ..., "hash_algorithm": "blake2b", "size": ..., "mtime_ns": ...,
+#                   "file_id": ..., "vector_store_file_id": ...}
+# Entries without hash_algorithm hold an md5 from older runs
+# Pages uploaded as section documents have file_id None and a "sections" list
+# of {"file_id", "vector_store_file_id", "filename", "anchor"} instead.
+# Duplicate pages have no files and an "alias_of" path plus their "url";
+# "content_hash"/"minhash" hold the dedup fingerprint
+# Parallel file hashing for vector store change detection (hashlib releases the GIL)
+HASH_WORKERS = 8
+# Pipeline mode uploads a partial batch once no page has arrived for this long
+PIPELINE_FLUSH_SECONDS = 5
 
 # Initialize Bing grounding tool only if connection name is available
 # Initialize Bing grounding tool only if connection name is available
@@ -52,6 +96,90 @@ def get_bing_grounding_tool():
         print("🐛 DEBUG: No BING_CONNECTION_NAME found, skipping Bing tool")
         return None
 
+def _scan_file_guids(file_path: str):
+    """Process-pool worker: return (file_path, GUIDs mentioned in the file, error)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return file_path, set(ADO_USER_GUID_PATTERN.findall(f.read())), None
+    except Exception as e:
+        return file_path, set(), str(e)
+
+# Display names for the GUID rewrite workers, set once per process by _init_guid_rewriter
+_guid_display_names: Dict[str, str] = {}
+
+def _init_guid_rewriter(display_names: Dict[str, str]) -> None:
+    global _guid_display_names
+    _guid_display_names = display_names
+
+def _rewrite_file_guids(file_path: str):
+    """Process-pool worker: replace resolvable @<GUID> mentions, atomically replacing the file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            original_content = f.read()
+        
+        replaced = 0
+        def substitute(match):
+            nonlocal replaced
+            display_name = _guid_display_names.get(match.group(1).lower())
+            if not display_name or display_name == 'Unknown User':
+                # Keep original if we couldn't resolve it
+                return match.group(0)
+            replaced += 1
+            return f"@{display_name}"
+        
+        modified_content = ADO_USER_GUID_PATTERN.sub(substitute, original_content)
+        if modified_content != original_content:
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(modified_content)
+            os.replace(tmp_path, file_path)
+        return file_path, replaced, None
+    except Exception as e:
+        return file_path, 0, str(e)
+
+def _hash_page_body(file_path: str):
+    """Return (file_path, md5, git blob sha1, error) of a downloaded page minus its online link header.
+
+    The md5 matches the content hash the incremental sync records and the sha1
+    matches ADO's git object ID, as long as the body was not rewritten locally
+    (e.g. by GUID resolution).
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                data = b""
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                start = 0
+                if data[:len(PAGE_HEADER_PREFIX)] == PAGE_HEADER_PREFIX:
+                    separator = data.find(b"\n\n")
+                    start = separator + 2 if separator != -1 else size
+                body = memoryview(data)[start:]
+                try:
+                    md5 = hashlib.md5(body).hexdigest()
+                    sha1 = hashlib.sha1(b"blob %d\0" % len(body))
+                    sha1.update(body)
+                finally:
+                    body.release()
+            finally:
+                if size:
+                    data.close()
+        return file_path, md5, sha1.hexdigest(), None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+def _hash_file(file_path: str, legacy_md5: bool = False):
+    """Return (file_path, blake2b hex, md5 hex if legacy_md5 else None, error) of a file's bytes"""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        md5 = hashlib.md5(data).hexdigest() if legacy_md5 else None
+        return file_path, hashlib.blake2b(data, digest_size=16).hexdigest(), md5, None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
 class AKSWikiAssistant:
     def __init__(self):
         print("🐛 DEBUG: Starting AKSWikiAssistant initialization...")
@@ -70,11 +198,16 @@ class AKSWikiAssistant:
         self.deployment_name = os.environ.get("AZURE_OPENAI_MODEL_EMAIL")
         self.vector_store_id = None
         self.assistant_id = None
-        self.thread_id = None
-        
-        print("🐛 DEBUG: Loading wiki URL mapping...")
-        self.wiki_url_mapping = self.load_wiki_url_mapping()
-        print("🐛 DEBUG: ✅ Wiki URL mapping loaded")
+        self.ado_client = None
+        self._ado_client_pat = None
+        self.identity_cache = None
+        self.catalog = WikiCatalog.shared(os.path.join(CATALOG_DIR, CATALOG_FILE), legacy_dir=CATALOG_DIR)
+        self.file_names = FileNameCache.shared(self.catalog)
+        self.thread_pool = WarmThreadPool(self.client, registry=self.catalog)
+        self.sessions = SessionThreads(self.lease_thread, self._delete_thread)
+        # The full URL mapping is only loaded when ingestion edits it; lookups go through the catalog index
+        self._wiki_url_mapping = None
+        self.wiki_url_aliases = self.load_wiki_url_aliases()
         
         print("🐛 DEBUG: Initializing AI grader...")
         self.ai_grader = AIResponseGrader()
@@ -180,45 +313,66 @@ class AKSWikiAssistant:
     
     
     
+    @property
+    def wiki_url_mapping(self) -> Dict[str, str]:
+        """Uploaded filename -> page URL, loaded from the catalog on first use"""
+        if getattr(self, '_wiki_url_mapping', None) is None:
+            self._wiki_url_mapping = self.load_wiki_url_mapping()
+        return self._wiki_url_mapping
+
+    @wiki_url_mapping.setter
+    def wiki_url_mapping(self, mapping: Dict[str, str]) -> None:
+        self._wiki_url_mapping = mapping
+
     def load_wiki_url_mapping(self) -> Dict[str, str]:
-        """Load the wiki URL mapping from file"""
+        """Load the wiki URL mapping (uploaded filename -> page URL) from the catalog"""
         try:
-            mapping_path = os.path.join(os.path.dirname(__file__), WIKI_URL_MAPPING_FILE)
-            if os.path.exists(mapping_path):
-                with open(mapping_path, 'r', encoding='utf-8') as f:
-                    mapping = json.load(f)
-                    print(f"✅ Loaded {len(mapping)} wiki URL mappings")
-                    return mapping
+            mapping = self.catalog.load_url_mappings()
+            if mapping:
+                print(f"✅ Loaded {len(mapping)} wiki URL mappings")
             else:
-                print(f"⚠️  Wiki URL mapping file not found at {mapping_path}")
-                return {}
+                print(f"⚠️  No wiki URL mappings in {self.catalog.db_path}")
+            return mapping
         except Exception as e:
             print(f"❌ Error loading wiki URL mapping: {e}")
             return {}
 
+    def load_wiki_url_aliases(self) -> Dict[str, List[str]]:
+        """Load the URLs of deduplicated pages, keyed by their canonical page's filename"""
+        try:
+            return self._alias_urls(entry for _, _, entry in self.catalog.aliases())
+        except Exception as e:
+            print(f"❌ Error loading wiki URL aliases: {e}")
+        return {}
+
+    def _alias_urls(self, entries) -> Dict[str, List[str]]:
+        aliases = {}
+        for entry in entries:
+            if entry.get('alias_of') and entry.get('url'):
+                aliases.setdefault(os.path.basename(entry['alias_of']), []).append(entry['url'])
+        return aliases
+
+    def _refresh_wiki_url_aliases(self, uploaded_files: Dict[str, Dict]) -> None:
+        """Rebuild the alias URLs from the manifest's duplicate pages"""
+        self.wiki_url_aliases = self._alias_urls(list(uploaded_files.values()))
+
+    def _save_wiki_url_mapping(self) -> None:
+        """Persist changes to the wiki URL mapping (e.g. after section documents were added)"""
+        self.catalog.save_url_mappings(self.wiki_url_mapping)
+
     def get_public_url(self, wiki_filename: str) -> Optional[str]:
-        """Get the public URL for a wiki file using the mapping"""
-        if not self.wiki_url_mapping:
+        """Get the public URL for a wiki file (exact filename, else extension-less and case-insensitive)"""
+        try:
+            return self.catalog.public_url(wiki_filename)
+        except Exception as e:
+            print(f"❌ Error looking up wiki URL for {wiki_filename}: {e}")
             return None
-        
-        # Try exact match first
-        if wiki_filename in self.wiki_url_mapping:
-            mapping_value = self.wiki_url_mapping[wiki_filename]
-            # Extract URL from markdown link format
-            if mapping_value.startswith('[View this page online](') and mapping_value.endswith(')'):
-                return mapping_value[24:-1]  # Remove '[View this page online](' and ')'
-        
-        # Try without extension
-        filename_without_ext = wiki_filename.replace('.md', '')
-        for key, value in self.wiki_url_mapping.items():
-            if key.replace('.md', '') == filename_without_ext:
-                if value.startswith('[View this page online](') and value.endswith(')'):
-                    return value[24:-1]
-        
-        return None
     
     def process_wiki_files(self, wiki_path: str, subpath: str = "AKS", vector_store_id: str = None) -> List[str]:
-        """Process cloned wiki files and optionally upload them incrementally"""
+        """Process cloned wiki files and optionally upload them incrementally.
+
+        The wiki URL header is added to the uploaded copy only, so the files on disk stay pristine.
+        """
         print(f"\n📁 Processing wiki files from: {wiki_path}")
         
         # Look for AKS folder
@@ -236,8 +390,8 @@ class AKSWikiAssistant:
         print(f"📊 Found {total_files} markdown files to process")
         
         file_count = 0
-        batch_files = []
-        batch_size = 50  # Upload every 50 files
+        # Upload while processing, with several batches in flight
+        uploader = VectorStoreUploader(self.client, vector_store_id, self._record_file_names) if vector_store_id else None
         
         for root, dirs, files in os.walk(aks_path):
             for file in files:
@@ -256,85 +410,59 @@ class AKSWikiAssistant:
                         with open(file_path, 'r', encoding='utf-8') as f:
                             content = f.read()
                         
-                        # Add wiki URL at the top if not already present
+                        # Add wiki URL at the top if not already present; the file on disk is left untouched
                         if not content.startswith("[View this page online]"):
-                            modified_content = f"[View this page online]({wiki_url})\n\n{content}"
-                            
-                            # Write back the modified content
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                f.write(modified_content)
+                            content = f"[View this page online]({wiki_url})\n\n{content}"
                         
                         processed_files.append(file_path)
                         
-                        # Add to batch for incremental upload
-                        if vector_store_id and any(file_path.lower().endswith(ext) for ext in SUPPORTED_FORMATS):
-                            if os.path.getsize(file_path) > 0:
-                                batch_files.append(file_path)
+                        # Queue the in-memory upload stream
+                        if uploader and any(file_path.lower().endswith(ext) for ext in SUPPORTED_FORMATS):
+                            uploader.add([((file, content.encode('utf-8')),)])
                         
                         # Show progress
                         if file_count % 100 == 0:
                             print(f"  ✓ Processed {file_count}/{total_files} files...")
                         
-                        # Upload batch if we hit the batch size
-                        if vector_store_id and len(batch_files) >= batch_size:
-                            self._upload_batch(vector_store_id, batch_files, file_count - len(batch_files) + 1, file_count)
-                            batch_files = []
-                        
                     except Exception as e:
                         print(f"  ❌ Error processing {file_path}: {e}")
         
-        # Upload any remaining files
-        if vector_store_id and batch_files:
-            self._upload_batch(vector_store_id, batch_files, file_count - len(batch_files) + 1, file_count)
+        # Wait for the remaining uploads to be indexed
+        if uploader:
+            self._print_upload_stats(uploader.wait())
         
         print(f"✅ Processed {len(processed_files)} wiki files total")
         return processed_files
 
-    def _upload_batch(self, vector_store_id: str, file_paths: List[str], start_idx: int, end_idx: int) -> None:
-        """Upload a batch of files to the vector store"""
-        print(f"\n  📤 Uploading files {start_idx} to {end_idx}...")
-        
-        file_streams = []
-        for file_path in file_paths:
-            try:
-                file_streams.append(open(file_path, "rb"))
-            except Exception as e:
-                print(f"    ❌ Error opening {file_path}: {e}")
-        
-        if file_streams:
-            try:
-                file_batch = self.client.beta.vector_stores.file_batches.upload_and_poll(
-                    vector_store_id=vector_store_id, 
-                    files=file_streams
-                )
-                print(f"    ✅ Upload complete - Status: {file_batch.status}")
-                print(f"    📊 Completed: {file_batch.file_counts.completed}, Failed: {file_batch.file_counts.failed}")
-                
-                # Show sample of uploaded files
-                if file_batch.file_counts.completed > 0:
-                    print(f"    📁 Sample files uploaded:")
-                    for i, path in enumerate(file_paths[:3]):  # Show first 3
-                        print(f"       - {os.path.basename(path)}")
-                    if len(file_paths) > 3:
-                        print(f"       ... and {len(file_paths) - 3} more")
-                        
-            except Exception as e:
-                print(f"    ❌ Error uploading batch: {e}")
-            finally:
-                for f in file_streams:
-                    f.close()
+    def _upload_files(self, vector_store_id: str, file_paths: List[str]) -> Dict:
+        """Upload files to the vector store, keeping several batches in flight"""
+        uploader = VectorStoreUploader(self.client, vector_store_id, self._record_file_names)
+        uploader.add((file_path,) for file_path in file_paths)
+        return self._print_upload_stats(uploader.wait())
+
+    def _record_file_names(self, items: List, file_batch, file_ids: List[str]) -> None:
+        """Uploader callback: remember uploaded filenames so citations resolve without an API call"""
+        self.file_names.put_many({
+            file_id: item[0][0] if isinstance(item[0], tuple) else os.path.basename(item[0])
+            for item, file_id in zip(items, file_ids) if file_id
+        })
+
+    def _print_upload_stats(self, stats: Dict) -> Dict:
+        print(f"\n  ✅ Upload complete - {stats['batches']} batches, {stats['files']} files")
+        print(f"  📊 Completed: {stats['completed']}, Failed: {stats['failed']}, "
+              f"Retried: {stats['retried']}, Batch errors: {stats['errors']}")
+        return stats
 
     def create_or_load_vector_store(self, wiki_path: str, subpath: str = "AKS") -> str:
         """Create or load existing vector store"""
         print(f"\n🗄️  Setting up vector store...")
         
         # Check if vector store already exists
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                self.vector_store_id = data.get('vector_store_id')
-                print(f"✅ Loaded existing vector store: {self.vector_store_id}")
-                return self.vector_store_id
+        vector_store_id = self.catalog.get_resource(VECTOR_STORE)
+        if vector_store_id:
+            self.vector_store_id = vector_store_id
+            print(f"✅ Loaded existing vector store: {self.vector_store_id}")
+            return self.vector_store_id
         
         # Process wiki files first
         processed_files = self.process_wiki_files(wiki_path, subpath, vector_store_id=None)
@@ -365,8 +493,7 @@ class AKSWikiAssistant:
             self.vector_store_id = vector_store.id
             
             # Save vector store ID immediately
-            with open(VECTOR_STORE_FILE, "w") as f:
-                json.dump({"vector_store_id": vector_store.id}, f)
+            self.catalog.set_resource(VECTOR_STORE, vector_store.id)
             print(f"💾 Vector store created: {self.vector_store_id}")
             
         except Exception as e:
@@ -422,29 +549,28 @@ class AKSWikiAssistant:
         print(f"\n🤖 Setting up AI assistant...")
         
         # Check if assistant already exists
-        if os.path.exists(ASSISTANT_ID_FILE):
-            with open(ASSISTANT_ID_FILE, 'r') as f:
-                data = json.load(f)
-                self.assistant_id = data.get('assistant_id')
-                print(f"✅ Loaded existing assistant: {self.assistant_id}")
-                
-                # CRITICAL: Ensure existing assistant has vector store access
-                if self.vector_store_id:
-                    print("🔧 Updating existing assistant with vector store access...")
-                    try:
-                        self.client.beta.assistants.update(
-                            assistant_id=self.assistant_id,
-                            tool_resources={"file_search": {"vector_store_ids": [self.vector_store_id]}}
-                        )
-                        print("✅ Assistant updated with vector store access")
-                    except Exception as e:
-                        print(f"❌ Failed to update assistant with vector store: {e}")
-                        print("🔧 Will create new assistant...")
-                        # Remove the file and create new assistant
-                        os.remove(ASSISTANT_ID_FILE)
-                        return self.create_or_load_assistant()
-                
-                return self.assistant_id
+        assistant_id = self.catalog.get_resource(ASSISTANT)
+        if assistant_id:
+            self.assistant_id = assistant_id
+            print(f"✅ Loaded existing assistant: {self.assistant_id}")
+            
+            # CRITICAL: Ensure existing assistant has vector store access
+            if self.vector_store_id:
+                print("🔧 Updating existing assistant with vector store access...")
+                try:
+                    self.client.beta.assistants.update(
+                        assistant_id=self.assistant_id,
+                        tool_resources={"file_search": {"vector_store_ids": [self.vector_store_id]}}
+                    )
+                    print("✅ Assistant updated with vector store access")
+                except Exception as e:
+                    print(f"❌ Failed to update assistant with vector store: {e}")
+                    print("🔧 Will create new assistant...")
+                    # Forget the assistant and create a new one
+                    self.catalog.delete_resource(ASSISTANT)
+                    return self.create_or_load_assistant()
+            
+            return self.assistant_id
         
         # Create new assistant
         print("🔧 Creating new assistant...")
@@ -484,8 +610,7 @@ class AKSWikiAssistant:
             )
             
             # Save assistant ID
-            with open(ASSISTANT_ID_FILE, "w") as f:
-                json.dump({"assistant_id": assistant.id}, f)
+            self.catalog.set_resource(ASSISTANT, assistant.id)
             
             self.assistant_id = assistant.id
             print(f"✅ Assistant created: {self.assistant_id}")
@@ -551,75 +676,216 @@ class AKSWikiAssistant:
     #     else:
     #         print(f"❌ Run failed with status: {run.status}")
 
+    def _citation(self, file_name: str, file_id: Optional[str] = None) -> Optional[Dict]:
+        """Source entry for a cited file: {'title', 'url', 'aliases', 'file_id'} (None without a public URL)"""
+        # Get public URL from mapping
+        public_url = self.get_public_url(file_name)
+        if not public_url:
+            return None
+        
+        # Clean up filename for display
+        display_name = file_name.replace('.md', '').replace('_', ' ').replace('-', ' ')
+        # Capitalize appropriately
+        display_parts = display_name.split('/')
+        display_name = display_parts[-1].title() if display_parts else display_name.title()
+        
+        # Duplicate pages were indexed once; list where else the content lives
+        page_name = file_name.split(' § ')[0] + '.md' if ' § ' in file_name else file_name
+        alias_urls = getattr(self, 'wiki_url_aliases', {}).get(page_name, [])
+        return {'title': display_name, 'url': public_url, 'aliases': alias_urls[:5], 'file_id': file_id}
+
+    def _citation_html(self, citation: Dict) -> str:
+        # Create clean HTML hyperlink
+        link_html = f'<a href="{citation["url"]}" target="_blank" style="color: #2563eb; text-decoration: underline; font-weight: 500;">{citation["title"]}</a>'
+        if citation['aliases']:
+            alias_links = ', '.join(
+                f'<a href="{url}" target="_blank" style="color: #2563eb;">{i + 1}</a>'
+                for i, url in enumerate(citation['aliases'])
+            )
+            link_html += f' (also: {alias_links})'
+        return link_html
+
+    def _sources_html(self, citations: List[Dict]) -> str:
+        """The "Sources:" block appended to answers ("" without citations)"""
+        if not citations:
+            return ""
+        # Format as a nice HTML list
+        citations_html = '\n\n<strong>Sources:</strong>\n'
+        for citation in citations:
+            citations_html += f'• {self._citation_html(citation)}\n'
+        return citations_html
+
     def process_citations(self, message_content: str, annotations: List) -> str:
         """Process citations and convert to clean HTML hyperlinks"""
         if not annotations:
             return message_content
         
-        citation_links = []
+        citations = []
         processed_files = set()
         
-        for annotation in annotations:
-            # Remove citation markers from content
-            pattern = re.escape(annotation.text)
-            message_content = re.sub(pattern, "", message_content)
+        # Resolve every cited file up front: cached names, with misses retrieved in parallel
+        file_names = self.file_names.resolve(self.client, [
+            annotation.file_citation.file_id for annotation in annotations if hasattr(annotation, "file_citation")
+        ])
+        
+        # One pass in text order: cut each marker out by its offsets while collecting the sources
+        ordered = sorted(annotations, key=lambda a: (getattr(a, 'start_index', None) is None,
+                                                     getattr(a, 'start_index', None) or 0))
+        pieces = []
+        position = 0
+        unanchored = set()
+        for annotation in ordered:
+            start, end = getattr(annotation, 'start_index', None), getattr(annotation, 'end_index', None)
+            if start is not None and end is not None and message_content[start:end] == annotation.text:
+                if start >= position:
+                    pieces.append(message_content[position:start])
+                    position = end
+            elif annotation.text:
+                unanchored.add(annotation.text)
             
             if hasattr(annotation, "file_citation"):
-                file_citation = annotation.file_citation
-                cited_file = self.client.files.retrieve(file_citation.file_id)
-                
-                file_name = cited_file.filename
+                file_name = file_names.get(annotation.file_citation.file_id)
                 
-                # Skip if we've already processed this file
-                if file_name in processed_files:
+                # Skip if we've already processed this file (or it could not be looked up)
+                if not file_name or file_name in processed_files:
                     continue
                 processed_files.add(file_name)
                 
-                # Clean up filename for display
-                display_name = file_name.replace('.md', '').replace('_', ' ').replace('-', ' ')
-                # Capitalize appropriately
-                display_parts = display_name.split('/')
-                display_name = display_parts[-1].title() if display_parts else display_name.title()
-                
-                # Get public URL from mapping
-                public_url = self.get_public_url(file_name)
-                
-                if public_url:
-                    # Create clean HTML hyperlink
-                    link_html = f'<a href="{public_url}" target="_blank" style="color: #2563eb; text-decoration: underline; font-weight: 500;">{display_name}</a>'
-                    citation_links.append(link_html)
+                citation = self._citation(file_name, annotation.file_citation.file_id)
+                if citation:
+                    citations.append(citation)
+        
+        pieces.append(message_content[position:])
+        message_content = ''.join(pieces)
+        # Markers whose offsets don't match the text are removed by value
+        for marker in unanchored:
+            message_content = message_content.replace(marker, "")
         
         # Add "Sources:" section with clean HTML hyperlinks
-        if citation_links:
-            # Format as a nice HTML list
-            citations_html = '\n\n<strong>Sources:</strong>\n'
-            for link in citation_links:
-                citations_html += f'• {link}\n'
-            message_content += citations_html
-        
-        return message_content
-    def ask_question(self, question: str, return_response: bool = False, stream: bool = False):
-            """Ask a question to the assistant"""
+        return message_content + self._sources_html(citations)
+
+    def stream_answer(self, run):
+        """Turn a streaming run into answer events, resolving citations as they arrive.
+
+        Citations come from the annotations on thread.message.delta events (and
+        thread.message.completed for any the deltas did not carry), so no
+        messages.list call is needed after the run. Yields dicts:
+        {'type': 'content', 'content'} with citation markers cut out,
+        {'type': 'citation', 'citation'} the first time each source is cited, and
+        a final {'type': 'sources', 'content'} with the "Sources:" block.
+        """
+        received = 0            # characters of raw message text so far
+        handled = set()         # (start_index, end_index) of annotations already used
+        processed_files = set()
+        citations = []
+        
+        def new_citations(annotations):
+            annotations = [a for a in annotations if hasattr(a, 'file_citation') and getattr(a, 'file_citation', None)]
+            if not annotations:
+                return
+            file_names = self.file_names.resolve(self.client, [a.file_citation.file_id for a in annotations])
+            for annotation in annotations:
+                file_name = file_names.get(annotation.file_citation.file_id)
+                if not file_name or file_name in processed_files:
+                    continue
+                processed_files.add(file_name)
+                citation = self._citation(file_name, annotation.file_citation.file_id)
+                if citation:
+                    citation['index'] = len(citations) + 1
+                    citations.append(citation)
+                    yield {'type': 'citation', 'citation': citation}
+        
+        for event in run:
+            if event.event == 'thread.message.created':
+                received, handled = 0, set()
+            elif event.event == 'thread.message.delta':
+                for content in event.data.delta.content or []:
+                    text = getattr(content, 'text', None)
+                    if text is None:
+                        continue
+                    value = text.value or ""
+                    annotations = [a for a in (getattr(text, 'annotations', None) or [])
+                                   if (getattr(a, 'start_index', None), getattr(a, 'end_index', None)) not in handled]
+                    
+                    # Annotation offsets are message-wide; cut the markers that fall inside this chunk
+                    chunk, position = [], 0
+                    for annotation in sorted(annotations, key=lambda a: getattr(a, 'start_index', None) or 0):
+                        start, end = getattr(annotation, 'start_index', None), getattr(annotation, 'end_index', None)
+                        if start is None or end is None:
+                            continue
+                        handled.add((start, end))
+                        start, end = max(start - received, position), min(end - received, len(value))
+                        if start < end:
+                            chunk.append(value[position:start])
+                            position = end
+                    chunk.append(value[position:])
+                    received += len(value)
+                    
+                    chunk = ''.join(chunk)
+                    if chunk:
+                        yield {'type': 'content', 'content': chunk}
+                    yield from new_citations(annotations)
+            elif event.event == 'thread.message.completed':
+                for content in event.data.content:
+                    text = getattr(content, 'text', None)
+                    if text is not None:
+                        yield from new_citations(getattr(text, 'annotations', None) or [])
+            elif event.event in ('thread.run.failed', 'thread.run.cancelled', 'thread.run.expired'):
+                print(f"❌ Run ended with status: {event.event.rsplit('.', 1)[-1]}")
+                break
+        
+        if citations:
+            yield {'type': 'sources', 'content': self._sources_html(citations)}
+
+    def lease_thread(self, owner: str = "ask_question") -> str:
+        """An empty thread with the wiki vector store attached, from the warm pool when one is ready.
+
+        Threads are registered in the catalog under owner (the endpoint using
+        them) so the reaper deletes them once they expire.
+        """
+        thread_id = self.thread_pool.lease(self.vector_store_id, owner)
+        print(f"🐛 DEBUG: ✅ Thread leased: {thread_id}")
+        return thread_id
+
+    def _delete_thread(self, thread_id: str) -> None:
+        self.client.beta.threads.delete(thread_id)
+        self.catalog.forget_threads([thread_id])
+
+    @contextmanager
+    def _single_shot_thread(self, owner: str):
+        """A fresh thread for one question, deleted afterwards"""
+        thread_id = self.lease_thread(owner)
+        try:
+            yield thread_id
+        finally:
+            try:
+                self._delete_thread(thread_id)
+            except Exception as e:
+                print(f"⚠️  Could not delete thread {thread_id}: {e}")
+
+    def ask_question(self, question: str, return_response: bool = False, stream: bool = False,
+                     events: bool = False, session_id: Optional[str] = None, owner: str = "ask_question"):
+            """Ask a question to the assistant (with stream and events, yields stream_answer's events)
+
+            Questions with a session_id continue that session's conversation thread;
+            without one they run on a single-shot thread that is deleted afterwards.
+            owner names the caller in the thread registry.
+            """
             print(f"🐛 DEBUG: ask_question called with: question='{question}', return_response={return_response}, stream={stream}")
             
-            if not self.thread_id:
-                print("🐛 DEBUG: Creating new thread...")
-                thread = self.client.beta.threads.create(
-                    tool_resources={
-                        "file_search": {
-                            "vector_store_ids": [self.vector_store_id]
-                        }
-                    }
-                )
-                self.thread_id = thread.id
-                print(f"🐛 DEBUG: ✅ Thread created: {self.thread_id}")
-            else:
-                print(f"🐛 DEBUG: Using existing thread: {self.thread_id}")
+            lease = self.sessions.lease(session_id) if session_id else self._single_shot_thread(owner)
+            with lease as thread_id:
+                # Session threads stay registered (and safe from the reaper) while in use
+                self.catalog.touch_thread(thread_id, owner)
+                return (yield from self._ask_in_thread(thread_id, question, return_response, stream, events))
+
+    def _ask_in_thread(self, thread_id: str, question: str, return_response: bool, stream: bool, events: bool):
+            print(f"🐛 DEBUG: Using thread: {thread_id}")
             
             # Add message to thread
             print("🐛 DEBUG: Adding message to thread...")
             self.client.beta.threads.messages.create(
-                thread_id=self.thread_id,
+                thread_id=thread_id,
                 role="user",
                 content=question,  
             )
@@ -672,7 +938,7 @@ class AKSWikiAssistant:
                 print("🐛 DEBUG: Creating streaming run...")
                 try:
                     run = self.client.beta.threads.runs.create(
-                        thread_id=self.thread_id,
+                        thread_id=thread_id,
                         assistant_id=self.assistant_id,
                         instructions="""You MUST search through the uploaded AKS documentation files to answer this question comprehensively. 
 
@@ -698,36 +964,16 @@ class AKSWikiAssistant:
                     print(f"🐛 DEBUG: ❌ Error creating streaming run: {type(e).__name__}: {str(e)}")
                     raise
                 
-                response_content = ""
                 print("🐛 DEBUG: Starting to process stream events...")
                 
                 try:
-                    for event in run:
-                        print(f"🐛 DEBUG: Stream event: {event.event}")
-                        if event.event == 'thread.message.delta':
-                            for content in event.data.delta.content:
-                                if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                                    chunk = content.text.value
-                                    response_content += chunk
-                                    yield chunk
-                        elif event.event == 'thread.run.completed':
-                            print("🐛 DEBUG: Run completed, processing citations...")
-                            # Process final content with citations
-                            messages = self.client.beta.threads.messages.list(thread_id=self.thread_id)
-                            for message in messages:
-                                if message.role == "assistant":
-                                    for content in message.content:
-                                        if hasattr(content, 'text'):
-                                            text_content = content.text.value
-                                            annotations = getattr(content.text, 'annotations', [])
-                                            final_content = self.process_citations(text_content, annotations)
-                                            
-                                            # Send any remaining content
-                                            if len(final_content) > len(response_content):
-                                                remaining = final_content[len(response_content):]
-                                                yield remaining
-                                            print("🐛 DEBUG: ✅ Streaming response completed")
-                                            return
+                    for event in self.stream_answer(run):
+                        if events:
+                            yield event
+                        elif event['type'] in ('content', 'sources'):
+                            yield event['content']
+                    print("🐛 DEBUG: ✅ Streaming response completed")
+                    return
                 except Exception as e:
                     print(f"🐛 DEBUG: ❌ Error processing stream: {type(e).__name__}: {str(e)}")
                     raise
@@ -735,7 +981,7 @@ class AKSWikiAssistant:
                 print("🐛 DEBUG: Creating non-streaming run...")
                 try:
                     run = self.client.beta.threads.runs.create_and_poll(
-                        thread_id=self.thread_id,
+                        thread_id=thread_id,
                         assistant_id=self.assistant_id,
                         instructions="""You MUST search through the uploaded AKS documentation files to answer this question comprehensively. 
 
@@ -767,7 +1013,7 @@ class AKSWikiAssistant:
                 print("🐛 DEBUG: Run completed successfully, processing messages...")
                 # Get messages
                 messages = self.client.beta.threads.messages.list(
-                    thread_id=self.thread_id
+                    thread_id=thread_id
                 )
                 for message in messages:
                     if message.role == "assistant":
@@ -801,15 +1047,15 @@ class AKSWikiAssistant:
                 break
             
             if question:
-                self.ask_question(question)
+                # Drain the generator so the answer is printed
+                for _ in self.ask_question(question, session_id=CLI_SESSION):
+                    pass
 
     def delete_vector_store(self) -> None:
         """Delete the vector store completely"""
-        # Try to load from file if not already loaded
-        if not self.vector_store_id and os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                self.vector_store_id = data.get('vector_store_id')
+        # Try to load from the catalog if not already loaded
+        if not self.vector_store_id:
+            self.vector_store_id = self.catalog.get_resource(VECTOR_STORE)
         
         if not self.vector_store_id:
             print("❌ No vector store found to delete")
@@ -827,25 +1073,22 @@ class AKSWikiAssistant:
             self.client.beta.vector_stores.delete(self.vector_store_id)
             print(f"✅ Vector store {self.vector_store_id} deleted successfully")
             
-            # Remove the saved file
-            if os.path.exists(VECTOR_STORE_FILE):
-                os.remove(VECTOR_STORE_FILE)
-                print("✅ Removed vector store ID file")
+            # Forget the saved ID and everything uploaded to the store
+            self.catalog.delete_resource(VECTOR_STORE)
+            self.catalog.clear_uploads()
+            print("✅ Removed vector store from the catalog")
             
             # Also delete the assistant since it references this vector store
-            if os.path.exists(ASSISTANT_ID_FILE):
-                with open(ASSISTANT_ID_FILE, 'r') as f:
-                    assistant_id = json.load(f).get('assistant_id')
-                
-                if assistant_id:
-                    try:
-                        self.client.beta.assistants.delete(assistant_id)
-                        print(f"✅ Deleted assistant {assistant_id}")
-                    except Exception as e:
-                        print(f"⚠️  Could not delete assistant: {e}")
+            assistant_id = self.catalog.get_resource(ASSISTANT)
+            if assistant_id:
+                try:
+                    self.client.beta.assistants.delete(assistant_id)
+                    print(f"✅ Deleted assistant {assistant_id}")
+                except Exception as e:
+                    print(f"⚠️  Could not delete assistant: {e}")
                 
-                os.remove(ASSISTANT_ID_FILE)
-                print("✅ Removed assistant ID file")
+                self.catalog.delete_resource(ASSISTANT)
+                print("✅ Removed assistant from the catalog")
             
             self.vector_store_id = None
             self.assistant_id = None
@@ -854,12 +1097,9 @@ class AKSWikiAssistant:
             print(f"❌ Error deleting vector store: {e}")
     
     def download_ado_wiki(self, organization: str, project: str, wiki_name: str, 
-                      pat: str, subpage_path: str, save_dir: str) -> None:
+                      pat: str, subpage_path: str, save_dir: str,
+                      max_workers: int = ADO_MAX_FETCH_WORKERS) -> None:
         """Download ADO wiki pages with proper hierarchy and progress tracking"""
-        import base64
-        import requests
-        import time
-        
         print(f"\n📥 Starting ADO Wiki Download")
         print(f"=" * 50)
         print(f"📌 Organization: {organization}")
@@ -872,40 +1112,27 @@ class AKSWikiAssistant:
         # Base URLs
         base_url = f"https://dev.azure.com/{organization}/{project}/_apis/wiki/wikis/{wiki_name}"
         web_url = f"https://dev.azure.com/{organization}/{project}/_wiki/wikis/{wiki_name}"
-        auth = base64.b64encode(f":{pat}".encode()).decode()
-        headers = {"Authorization": f"Basic {auth}"}
+        client = self._get_ado_client(pat, max_workers)
 
         os.makedirs(save_dir, exist_ok=True)
         
-        # Fetch the full wiki page tree
+        # Stream the full wiki page tree; page fetches start as soon as each page is parsed
         print("\n🔍 Fetching wiki structure...")
         start_time = time.time()
+        subpage_path = subpage_path.strip("/")
+        tree_stats = {}
         
         try:
-            response = requests.get(
-                f"{base_url}/pages?path=/&recursionLevel=Full&api-version=7.1",
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
+            pages = self._iter_subpath_pages(self._open_page_tree(client, base_url), subpage_path, tree_stats)
+            pending = self._start_page_fetches(client, base_url, pages)
             print(f"✅ Wiki structure fetched in {time.time() - start_time:.2f}s")
         except Exception as e:
             print(f"❌ Failed to fetch wiki structure: {e}")
             return
 
-        # Handle different response formats
-        if "value" in data:
-            all_pages = data["value"]
-        else:
-            all_pages = self.flatten_pages(data)
+        print(f"📊 Total pages in wiki: {tree_stats['total']}")
 
-        print(f"📊 Total pages in wiki: {len(all_pages)}")
-
-        subpage_path = subpage_path.strip("/")
-        filtered_pages = [
-            p for p in all_pages
-            if p.get("gitItemPath", "").startswith(f"/{subpage_path}")
-        ]
+        filtered_pages = list(pending.values())
 
         if not filtered_pages:
             print(f"❌ No pages found under '{subpage_path}'.")
@@ -923,7 +1150,9 @@ class AKSWikiAssistant:
         print(f"\n⬇️  Downloading pages...")
         download_start = time.time()
         
-        for i, page in enumerate(filtered_pages):
+        fetch_stats = {}
+        
+        for i, (page, content, fetch_error) in enumerate(self._iter_fetched_pages(client, pending, fetch_stats)):
             path = page.get("path", "")
             
             # Show progress every 10 pages or for first/last 5
@@ -933,15 +1162,8 @@ class AKSWikiAssistant:
             encoded_path = requests.utils.quote(path, safe="")
 
             try:
-                # Get the content for this page
-                content_response = requests.get(
-                    f"{base_url}/pages?path={encoded_path}&includeContent=true&api-version=7.1-preview.1",
-                    headers=headers
-                )
-                content_response.raise_for_status()
-                
-                content_data = content_response.json()
-                content = content_data.get("content", "")
+                if fetch_error is not None:
+                    raise fetch_error
                 
                 # Show content size
                 content_size = len(content.encode('utf-8'))
@@ -1008,6 +1230,7 @@ class AKSWikiAssistant:
         print(f"   • Total size: {total_size / 1024 / 1024:.2f} MB")
         print(f"   • Time taken: {download_time:.1f}s")
         print(f"   • Average speed: {len(filtered_pages) / download_time:.1f} pages/s")
+        client.print_stats()
         print(f"   • Saved to: {os.path.abspath(save_dir)}")
         
         if error_pages:
@@ -1040,26 +1263,178 @@ class AKSWikiAssistant:
 
     def flatten_pages(self, page):
         """Helper for download_ado_wiki"""
-        pages = []
-        if "subPages" in page and page["subPages"]:
-            for sub in page["subPages"]:
-                pages.append(sub)
-                pages.extend(self.flatten_pages(sub))
-        return pages
-    
+        return list(self.iter_pages(page))
+
+    def iter_pages(self, page):
+        """Iteratively yield every subpage of a parsed page tree in pre-order (no recursion limit)"""
+        stack = list(reversed(page.get("subPages") or []))
+        while stack:
+            sub = stack.pop()
+            yield sub
+            stack.extend(reversed(sub.get("subPages") or []))
+
+    def _open_page_tree(self, client: AdoClient, base_url: str):
+        """Request the full page tree and return an iterator over its pages as they are parsed"""
+        url = f"{base_url}/pages?path=/&recursionLevel=Full&api-version=7.1"
+
+        if ijson is None:
+            data = client.run(client.get_json(url))
+            # Handle different response formats
+            return iter(data["value"]) if "value" in data else self.iter_pages(data)
+
+        response = client.run(client.request("GET", url, stream=True))
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return self._stream_pages(response)
+
+    def _stream_pages(self, response):
+        """Incrementally parse a page tree response, yielding each page once its path fields are known.
+
+        A page is yielded when its subPages key starts (or its object ends), so
+        parents are emitted before their children and only the open branch of
+        the tree is held in memory. Keys after subPages (url, remoteUrl) are not
+        collected. The wiki's root page (the response's top-level object) is
+        never saved as a file, so it is not yielded.
+        """
+        # One entry per open JSON container: a page frame for objects, None for arrays
+        stack = []
+        with response:
+            for prefix, event, value in ijson.parse(response.raw, use_float=True):
+                if event == 'start_map':
+                    # The root page counts as already emitted
+                    stack.append({'page': {}, 'key': None, 'emitted': not stack})
+                elif event == 'start_array':
+                    stack.append(None)
+                elif event == 'map_key':
+                    frame = stack[-1]
+                    frame['key'] = value
+                    if value == 'subPages' and 'path' in frame['page'] and not frame['emitted']:
+                        frame['emitted'] = True
+                        yield frame['page']
+                elif event == 'end_map':
+                    frame = stack.pop()
+                    if 'path' in frame['page'] and not frame['emitted']:
+                        yield frame['page']
+                elif event == 'end_array':
+                    stack.pop()
+                elif stack and stack[-1] is not None:
+                    # Scalar value directly inside an object
+                    stack[-1]['page'][stack[-1]['key']] = value
+
+    def _iter_subpath_pages(self, pages, subpage_path: str, stats: Dict = None):
+        """Yield pages under /subpage_path as they arrive, counting every page seen"""
+        if stats is None:
+            stats = {}
+        stats.setdefault('total', 0)
+        prefix = f"/{subpage_path.strip('/')}"
+        for page in pages:
+            stats['total'] += 1
+            if page.get("gitItemPath", "").startswith(prefix):
+                yield page
+
+    def _get_ado_client(self, pat: str, max_concurrency: Optional[int] = None) -> AdoClient:
+        """Return the shared throttle-aware ADO client for this PAT"""
+        if (self.ado_client is None or self._ado_client_pat != pat
+                or (max_concurrency and max_concurrency != self.ado_client.max_concurrency)):
+            if self.ado_client is not None:
+                self.ado_client.close()
+            max_concurrency = max_concurrency or ADO_MAX_FETCH_WORKERS
+            self.ado_client = AdoClient(pat, max_concurrency=max_concurrency,
+                                        initial_concurrency=min(ADO_FETCH_WORKERS, max_concurrency))
+            self._ado_client_pat = pat
+        return self.ado_client
+
+    async def _fetch_page_content(self, client: AdoClient, base_url: str, path: str) -> str:
+        """Fetch a single wiki page's content"""
+        encoded_path = requests.utils.quote(path, safe="")
+        data = await client.get_json(
+            f"{base_url}/pages?path={encoded_path}&includeContent=true&api-version=7.1-preview.1"
+        )
+        return data.get("content", "")
+
+    def _start_page_fetches(self, client: AdoClient, base_url: str, pages) -> Dict:
+        """Start fetching each page's content as soon as it is drawn from pages"""
+        fetch = lambda page: self._fetch_page_content(client, base_url, page.get("path", ""))
+        return client.submit_all(fetch, pages)
+
+    def _iter_fetched_pages(self, client: AdoClient, pending: Dict, stats: Dict = None):
+        """Yield (page, content, error) for started page fetches as they complete"""
+        if stats is None:
+            stats = {}
+        for key in ('pages', 'bytes', 'errors', 'elapsed'):
+            stats.setdefault(key, 0)
+        base_elapsed = stats['elapsed']
+        start = time.time()
+
+        for page, content, error in client.iter_completed(pending):
+            if error is None:
+                stats['pages'] += 1
+                stats['bytes'] += len(content.encode('utf-8'))
+            else:
+                stats['errors'] += 1
+            yield page, content, error
+
+            stats['elapsed'] = base_elapsed + time.time() - start
+            done = stats['pages'] + stats['errors']
+            if done % 500 == 0 and stats['elapsed'] > 0:
+                print(f"  ⚡ Fetched {done}/{len(pending)} pages | "
+                      f"{stats['pages'] / stats['elapsed']:.1f} pages/s | "
+                      f"{stats['bytes'] / 1024 / stats['elapsed']:.1f} KB/s | "
+                      f"Window: {client.limit:.1f} | "
+                      f"Throttled: {client.stats['throttled']} | "
+                      f"Errors: {stats['errors']}")
+
+        stats['elapsed'] = base_elapsed + time.time() - start
+
+    def _fetch_page_versions(self, client: AdoClient, organization: str, project: str,
+                             wiki_name: str, subpage_path: str) -> Dict[str, str]:
+        """Map each page's gitItemPath under subpage_path to its git object ID ({} if unavailable)"""
+        api_url = f"https://dev.azure.com/{organization}/{project}/_apis"
+
+        try:
+            wiki = client.run(client.get_json(f"{api_url}/wiki/wikis/{wiki_name}?api-version=7.1"))
+
+            repository_id = wiki["repositoryId"]
+            mapped_path = wiki.get("mappedPath", "/").rstrip("/")
+            branch = (wiki.get("versions") or [{}])[0].get("version")
+
+            versions = {}
+            # The page folder holds all subpages; the page itself lives next to it as <subpath>.md
+            for scope, recursion in ((f"/{subpage_path}", "Full"), (f"/{subpage_path}.md", "None")):
+                params = {"scopePath": f"{mapped_path}{scope}", "recursionLevel": recursion, "api-version": "7.1"}
+                if branch:
+                    params["versionDescriptor.version"] = branch
+                    params["versionDescriptor.versionType"] = "branch"
+
+                response = client.run(client.request("GET", f"{api_url}/git/repositories/{repository_id}/items",
+                                                     params=params, timeout=120))
+                if response.status_code == 404:
+                    continue
+                response.raise_for_status()
+
+                for item in response.json().get("value", []):
+                    if item.get("gitObjectType") == "blob" and item.get("path", "").endswith(".md"):
+                        versions[item["path"][len(mapped_path):]] = item["objectId"]
+
+            return versions
+        except Exception as e:
+            print(f"⚠️  Could not list page versions, falling back to content hashing: {e}")
+            return {}
+
     def download_ado_wiki_incremental(self, organization: str, project: str, wiki_name: str, 
-                                 pat: str, subpage_path: str, save_dir: str) -> None:
-        """Download ADO wiki pages incrementally, skipping unchanged files and updating changed ones"""
-        # Track what's already downloaded with checksums
-        downloaded_files_log = os.path.join(save_dir, "download_progress.json")
-        downloaded_files = {}  # Changed to dict to store checksums
-        
-        # Load existing progress
-        if os.path.exists(downloaded_files_log):
-            with open(downloaded_files_log, 'r') as f:
-                progress_data = json.load(f)
-                downloaded_files = progress_data.get('downloaded_files', {})
-                print(f"📋 Found existing progress: {len(downloaded_files)} files already tracked")
+                                 pat: str, subpage_path: str, save_dir: str,
+                                 max_workers: int = ADO_MAX_FETCH_WORKERS,
+                                 on_page_saved: Optional[Callable[[str], None]] = None) -> None:
+        """Download ADO wiki pages incrementally, skipping unchanged files and updating changed ones.
+
+        on_page_saved, if given, is called with each file written during the sync.
+        """
+        # Track what's already downloaded with checksums and ADO versions
+        page_progress = self.catalog.download_progress(save_dir)
+        downloaded_files = page_progress.hashes()
+        page_versions = page_progress.versions()
+        if downloaded_files:
+            print(f"📋 Found existing progress: {len(downloaded_files)} files already tracked")
         
         print(f"\n📥 Starting Incremental ADO Wiki Download")
         print(f"=" * 50)
@@ -1068,78 +1443,92 @@ class AKSWikiAssistant:
         print(f"📌 Wiki: {wiki_name}")
         print(f"📌 Subpath: {subpage_path}")
         print(f"📌 Save to: {save_dir}")
+        print(f"📌 Workers: up to {max_workers}")
         print(f"=" * 50)
         
         # Base URLs
         base_url = f"https://dev.azure.com/{organization}/{project}/_apis/wiki/wikis/{wiki_name}"
         web_url = f"https://dev.azure.com/{organization}/{project}/_wiki/wikis/{wiki_name}"
-        auth = base64.b64encode(f":{pat}".encode()).decode()
-        headers = {"Authorization": f"Basic {auth}"}
+        client = self._get_ado_client(pat, max_workers)
 
         os.makedirs(save_dir, exist_ok=True)
         
-        # Fetch the full wiki page tree
+        # Prefer per-page git object IDs so unchanged pages cost no content GET
+        subpage_path = subpage_path.strip("/")
+        current_versions = self._fetch_page_versions(client, organization, project, wiki_name, subpage_path)
+
+        # Analyze what needs to be downloaded/updated
+        filtered_pages = []
+        pages_to_download = []
+        pages_to_update = []
+        unchanged_pages = []
+        # (page, candidate source paths) for new pages whose content we already have locally
+        moved_pages = []
+        
+        paths_by_version = {}
+        for path, version in page_versions.items():
+            paths_by_version.setdefault(version, []).append(path)
+
+        def pages_needing_content(pages):
+            """Classify pages as they stream in, yielding those whose content must be fetched"""
+            for page in pages:
+                filtered_pages.append(page)
+                path = page.get("path", "")
+
+                if not current_versions:
+                    # No version metadata - every page is fetched and compared by content hash
+                    yield page
+                    continue
+
+                version = current_versions.get(page.get("gitItemPath", ""))
+                if path not in downloaded_files and version in paths_by_version:
+                    # Same git blob as a tracked page - a move or copy, no fetch needed
+                    moved_pages.append((page, paths_by_version[version]))
+                elif path not in downloaded_files:
+                    pages_to_download.append((page, None, None))
+                    yield page
+                elif version is None or page_versions.get(path) != version:
+                    pages_to_update.append((page, None, None))
+                    yield page
+                else:
+                    unchanged_pages.append(path)
+
+        # Stream the full wiki page tree; fetches start as soon as each changed page is parsed
         print("\n🔍 Fetching wiki structure...")
         start_time = time.time()
+        tree_stats = {}
+        fetch_stats = {}
         
         try:
-            response = requests.get(
-                f"{base_url}/pages?path=/&recursionLevel=Full&api-version=7.1",
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
+            pages = self._iter_subpath_pages(self._open_page_tree(client, base_url), subpage_path, tree_stats)
+            pending = self._start_page_fetches(client, base_url, pages_needing_content(pages))
             print(f"✅ Wiki structure fetched in {time.time() - start_time:.2f}s")
         except Exception as e:
             print(f"❌ Failed to fetch wiki structure: {e}")
             return
 
-        # Handle different response formats
-        if "value" in data:
-            all_pages = data["value"]
-        else:
-            all_pages = self.flatten_pages(data)
-
-        print(f"📊 Total pages in wiki: {len(all_pages)}")
-
-        subpage_path = subpage_path.strip("/")
-        filtered_pages = [
-            p for p in all_pages
-            if p.get("gitItemPath", "").startswith(f"/{subpage_path}")
-        ]
+        print(f"📊 Total pages in wiki: {tree_stats['total']}")
 
         if not filtered_pages:
             print(f"❌ No pages found under '{subpage_path}'.")
             return
 
-        # Analyze what needs to be downloaded/updated
-        pages_to_download = []
-        pages_to_update = []
-        unchanged_pages = []
-        
-        print(f"\n🔍 Analyzing changes...")
-        
-        for i, page in enumerate(filtered_pages):
-            path = page.get("path", "")
-            
-            # Show progress for analysis
-            if (i + 1) % 1000 == 0:
-                print(f"  Analyzed {i + 1}/{len(filtered_pages)} pages...")
-            
-            # Get page content to check if it's changed
-            encoded_path = requests.utils.quote(path, safe="")
-            try:
-                content_response = requests.get(
-                    f"{base_url}/pages?path={encoded_path}&includeContent=true&api-version=7.1-preview.1",
-                    headers=headers
-                )
-                content_response.raise_for_status()
-                content_data = content_response.json()
-                content = content_data.get("content", "")
-                
+        if current_versions:
+            print(f"\n🔍 Analyzed changes using {len(current_versions)} page versions")
+        else:
+            print(f"\n🔍 Analyzing changes by content hash with up to {max_workers} workers...")
+
+            for page, content, error in self._iter_fetched_pages(client, pending, fetch_stats):
+                path = page.get("path", "")
+
+                if error is not None:
+                    # If we can't get content, assume we need to download
+                    pages_to_download.append((page, None, None))
+                    continue
+
                 # Calculate content hash
                 content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-                
+
                 # Check if we have this file and if it's changed
                 if path not in downloaded_files:
                     pages_to_download.append((page, content, content_hash))
@@ -1147,20 +1536,60 @@ class AKSWikiAssistant:
                     pages_to_update.append((page, content, content_hash))
                 else:
                     unchanged_pages.append(path)
-                    
-            except Exception as e:
-                # If we can't get content, assume we need to download
-                pages_to_download.append((page, None, None))
-        
+
+            if fetch_stats['elapsed'] > 0:
+                print(f"⚡ Fetched {fetch_stats['pages']} pages in {fetch_stats['elapsed']:.1f}s | "
+                      f"{fetch_stats['pages'] / fetch_stats['elapsed']:.1f} pages/s | "
+                      f"{fetch_stats['bytes'] / 1024 / fetch_stats['elapsed']:.1f} KB/s | "
+                      f"Throttled: {client.stats['throttled']} | "
+                      f"Errors: {fetch_stats['errors']}")
+
+            # Refetch anything that failed during analysis
+            pending = self._start_page_fetches(
+                client, base_url, [page for page, content, _ in pages_to_download if content is None]
+            )
+
+        # Tracked pages missing from the tree were deleted or moved in ADO
+        live_paths = {page.get("path", "") for page in filtered_pages}
+        stale_paths = {path for path in downloaded_files if path not in live_paths}
+
+        if not current_versions and stale_paths:
+            # Without versions, a new page with a stale page's exact content is a move
+            stale_by_hash = {}
+            for path in stale_paths:
+                stale_by_hash.setdefault(downloaded_files[path], []).append(path)
+            new_pages = []
+            for page, content, content_hash in pages_to_download:
+                if content_hash in stale_by_hash:
+                    moved_pages.append((page, stale_by_hash[content_hash]))
+                else:
+                    new_pages.append((page, content, content_hash))
+            pages_to_download = new_pages
+
         print(f"\n📊 Analysis Results:")
         print(f"📄 Total pages under /{subpage_path}: {len(filtered_pages)}")
         print(f"✅ Unchanged: {len(unchanged_pages)}")
         print(f"🆕 New to download: {len(pages_to_download)}")
         print(f"🔄 Changed to update: {len(pages_to_update)}")
+        print(f"🚚 Moved or copied: {len(moved_pages)}")
+        print(f"🗑️  Deleted in ADO: {len(stale_paths)}")
+
+        moved_count, deleted_count, refetch_pages = self._apply_page_moves_and_deletions(
+            page_progress, downloaded_files, moved_pages, stale_paths, current_versions,
+            save_dir, subpage_path, web_url, on_page_saved
+        )
+        if refetch_pages:
+            pages_to_download.extend((page, None, None) for page in refetch_pages)
+            pending.update(self._start_page_fetches(client, base_url, refetch_pages))
         
         all_pages_to_process = pages_to_download + pages_to_update
         
         if not all_pages_to_process:
+            page_progress.update_meta(
+                completed=True,
+                last_session_stats={'new': 0, 'updated': 0, 'unchanged': len(unchanged_pages),
+                                    'moved': moved_count, 'deleted': deleted_count}
+            )
             print("🎉 All pages are up to date!")
             return
         
@@ -1174,7 +1603,15 @@ class AKSWikiAssistant:
         print(f"\n⬇️  Processing {len(all_pages_to_process)} pages...")
         download_start = time.time()
         
-        for i, (page, content, content_hash) in enumerate(all_pages_to_process):
+        def pages_with_content():
+            """Yield pages that already have content, then the in-flight fetches as they complete"""
+            for page, content, content_hash in all_pages_to_process:
+                if content is not None:
+                    yield page, content, content_hash, None
+            for page, content, error in self._iter_fetched_pages(client, pending, fetch_stats):
+                yield page, content, None, error
+
+        for i, (page, content, content_hash, fetch_error) in enumerate(pages_with_content()):
             path = page.get("path", "")
             is_update = path in downloaded_files
             
@@ -1184,16 +1621,9 @@ class AKSWikiAssistant:
                 print(f"\n[{i+1}/{len(all_pages_to_process)}] {action}: {path}")
             
             try:
-                # If we don't have content yet, fetch it
-                if content is None:
-                    encoded_path = requests.utils.quote(path, safe="")
-                    content_response = requests.get(
-                        f"{base_url}/pages?path={encoded_path}&includeContent=true&api-version=7.1-preview.1",
-                        headers=headers
-                    )
-                    content_response.raise_for_status()
-                    content_data = content_response.json()
-                    content = content_data.get("content", "")
+                if fetch_error is not None:
+                    raise fetch_error
+                if content_hash is None:
                     content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
                 
                 # Show content size
@@ -1203,25 +1633,16 @@ class AKSWikiAssistant:
                 if i < 5 or i >= len(all_pages_to_process) - 5 or (i + 1) % 10 == 0:
                     print(f"    📝 Content size: {content_size:,} bytes")
 
-                # Generate the live wiki URL for this page
-                encoded_path = requests.utils.quote(path, safe="")
-                wiki_page_url = f"{web_url}/?pagePath={encoded_path}"
-
                 # Resolve user GUIDs in the content if we have a PAT
                 if pat:  # We have PAT available, so resolve GUIDs
                     content = self.resolve_ado_user_guids(content, organization, pat)
 
-                modified_content = f"[View this page online]({wiki_page_url})\n\n{content}"
+                # Prefix the live wiki URL for this page
+                modified_content = f"[View this page online]({self._page_web_url(web_url, path)})\n\n{content}"
 
                 # Create proper directory structure
-                relative_path = path[len(f"/{subpage_path}"):].lstrip('/')
-                
-                if relative_path:
-                    file_dir = os.path.join(save_dir, os.path.dirname(relative_path))
-                    os.makedirs(file_dir, exist_ok=True)
-                    filename = os.path.join(save_dir, f"{relative_path}.md")
-                else:
-                    filename = os.path.join(save_dir, f"{subpage_path}.md")
+                filename = self._page_filename(save_dir, subpage_path, path)
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
 
                 with open(filename, "w", encoding="utf-8") as f:
                     f.write(modified_content)
@@ -1231,20 +1652,9 @@ class AKSWikiAssistant:
                 
                 success_count += 1
                 downloaded_files[path] = content_hash
-                
-                # Save progress every 10 files
-                if (i + 1) % 10 == 0:
-                    with open(downloaded_files_log, 'w') as f:
-                        json.dump({
-                            'downloaded_files': downloaded_files,
-                            'last_updated': time.time(),
-                            'total_tracked': len(downloaded_files),
-                            'last_session_stats': {
-                                'new': len(pages_to_download),
-                                'updated': len(pages_to_update),
-                                'unchanged': len(unchanged_pages)
-                            }
-                        }, f)
+                page_progress.record(path, content_hash, current_versions.get(page.get("gitItemPath", "")))
+                if on_page_saved:
+                    on_page_saved(filename)
                     
             except Exception as e:
                 error_count += 1
@@ -1266,18 +1676,16 @@ class AKSWikiAssistant:
                     f"Errors: {error_count}")
 
         # Save final progress
-        with open(downloaded_files_log, 'w') as f:
-            json.dump({
-                'downloaded_files': downloaded_files,
-                'last_updated': time.time(),
-                'total_tracked': len(downloaded_files),
-                'completed': True,
-                'last_session_stats': {
-                    'new': len(pages_to_download),
-                    'updated': len(pages_to_update),
-                    'unchanged': len(unchanged_pages)
-                }
-            }, f)
+        page_progress.update_meta(
+            completed=True,
+            last_session_stats={
+                'new': len(pages_to_download),
+                'updated': len(pages_to_update),
+                'unchanged': len(unchanged_pages),
+                'moved': moved_count,
+                'deleted': deleted_count
+            }
+        )
 
         # Final summary
         download_time = time.time() - download_start
@@ -1288,29 +1696,128 @@ class AKSWikiAssistant:
         print(f"   • New pages downloaded: {len(pages_to_download)}")
         print(f"   • Pages updated: {len(pages_to_update)}")
         print(f"   • Unchanged pages: {len(unchanged_pages)}")
+        print(f"   • Pages moved/copied: {moved_count}")
+        print(f"   • Pages deleted: {deleted_count}")
         print(f"   • Successfully processed: {success_count}")
         print(f"   • Failed: {error_count}")
         print(f"   • Total pages tracked: {len(downloaded_files)}")
         print(f"   • Total size this session: {total_size / 1024 / 1024:.2f} MB")
         print(f"   • Time taken: {download_time:.1f}s")
         print(f"   • Average speed: {len(all_pages_to_process) / download_time:.1f} pages/s" if download_time > 0 else "")
+        if fetch_stats['elapsed'] > 0:
+            print(f"   • Fetch throughput: {fetch_stats['pages'] / fetch_stats['elapsed']:.1f} pages/s, "
+                  f"{fetch_stats['bytes'] / 1024 / 1024 / fetch_stats['elapsed']:.2f} MB/s")
+        client.print_stats()
         print(f"   • Saved to: {os.path.abspath(save_dir)}")
 
+    def _page_filename(self, save_dir: str, subpage_path: str, path: str) -> str:
+        """Local markdown file for a wiki page path under /subpage_path"""
+        relative_path = path[len(f"/{subpage_path}"):].lstrip('/')
+        if relative_path:
+            return os.path.join(save_dir, f"{relative_path}.md")
+        return os.path.join(save_dir, f"{subpage_path}.md")
+
+    def _page_web_url(self, web_url: str, path: str) -> str:
+        """Live wiki URL for a page path"""
+        return f"{web_url}/?pagePath={requests.utils.quote(path, safe='')}"
+
+    def _remove_page_file(self, save_dir: str, filename: str) -> None:
+        """Delete a page's local file and prune directories left empty"""
+        if os.path.exists(filename):
+            os.remove(filename)
+        directory = os.path.dirname(os.path.abspath(filename))
+        root = os.path.abspath(save_dir)
+        while directory != root and directory.startswith(root) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+    def _apply_page_moves_and_deletions(self, page_progress: DownloadProgress, downloaded_files: Dict[str, str],
+                                        moved_pages: List, stale_paths, current_versions: Dict[str, str],
+                                        save_dir: str, subpage_path: str, web_url: str,
+                                        on_page_saved: Optional[Callable[[str], None]] = None):
+        """Relocate moved/copied pages from their local source and delete pages removed in ADO.
+
+        Returns (moved_count, deleted_count, pages whose source file was unusable and must be fetched).
+        """
+        # Pick a source per page: an unclaimed stale path is a move, anything else a copy
+        claimed = set()
+        plans = []
+        for page, sources in moved_pages:
+            source = next((s for s in sources if s in stale_paths and s not in claimed), sources[0])
+            is_move = source in stale_paths and source not in claimed
+            if is_move:
+                claimed.add(source)
+            plans.append((page, source, is_move))
+
+        moved_count = 0
+        refetch_pages = []
+        # Copies first, so they can still read a source that is about to be moved away
+        for page, source, is_move in sorted(plans, key=lambda plan: plan[2]):
+            path = page.get("path", "")
+            source_file = self._page_filename(save_dir, subpage_path, source)
+            target_file = self._page_filename(save_dir, subpage_path, path)
+            try:
+                with open(source_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                # Swap the online link header for the new location
+                header = "[View this page online]("
+                if content.startswith(header):
+                    content = content.split("\n\n", 1)[1] if "\n\n" in content else ""
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                with open(target_file, 'w', encoding='utf-8') as f:
+                    f.write(f"{header}{self._page_web_url(web_url, path)})\n\n{content}")
+            except Exception as e:
+                print(f"  ⚠️  Could not relocate {source} -> {path}, downloading instead: {e}")
+                if is_move:
+                    claimed.discard(source)
+                refetch_pages.append(page)
+                continue
+
+            content_hash = downloaded_files[source]
+            downloaded_files[path] = content_hash
+            page_progress.record(path, content_hash, current_versions.get(page.get("gitItemPath", "")))
+            if is_move:
+                if source_file != target_file:
+                    self._remove_page_file(save_dir, source_file)
+                downloaded_files.pop(source, None)
+                page_progress.remove(source)
+                print(f"  🚚 Moved: {source} -> {path}")
+            else:
+                print(f"  📋 Copied: {source} -> {path}")
+            moved_count += 1
+            if on_page_saved:
+                on_page_saved(target_file)
+
+        # Whatever stale path was not moved is gone from ADO
+        deleted_count = 0
+        for path in sorted(stale_paths - claimed):
+            try:
+                self._remove_page_file(save_dir, self._page_filename(save_dir, subpage_path, path))
+            except OSError as e:
+                print(f"  ⚠️  Could not delete local file for {path}: {e}")
+                continue
+            downloaded_files.pop(path, None)
+            page_progress.remove(path)
+            deleted_count += 1
+            if deleted_count <= 20:
+                print(f"  🗑️  Deleted: {path}")
+        if deleted_count > 20:
+            print(f"  ... and {deleted_count - 20} more deleted pages")
+
+        return moved_count, deleted_count, refetch_pages
+
     def check_download_status(self, save_dir: str) -> None:
         """Check what's been downloaded and what's missing"""
-        downloaded_files_log = os.path.join(save_dir, "download_progress.json")
+        page_progress = self.catalog.download_progress(save_dir)
         
-        if not os.path.exists(downloaded_files_log):
+        if not page_progress.exists():
             print("❌ No download progress found. Run --download first.")
             return
         
-        with open(downloaded_files_log, 'r') as f:
-            progress_data = json.load(f)
-        
-        downloaded_files = progress_data.get('downloaded_files', {})
-        last_updated = progress_data.get('last_updated', 0)
-        completed = progress_data.get('completed', False)
-        last_session = progress_data.get('last_session_stats', {})
+        downloaded_files = page_progress.entries
+        last_updated = page_progress.meta.get('last_updated', 0)
+        completed = page_progress.meta.get('completed', False)
+        last_session = page_progress.meta.get('last_session_stats', {})
         
         print(f"\n📊 Download Status Report")
         print(f"=" * 40)
@@ -1324,6 +1831,8 @@ class AKSWikiAssistant:
             print(f"   🆕 New downloads: {last_session.get('new', 0)}")
             print(f"   🔄 Updates: {last_session.get('updated', 0)}")
             print(f"   ✅ Unchanged: {last_session.get('unchanged', 0)}")
+            print(f"   🚚 Moved: {last_session.get('moved', 0)}")
+            print(f"   🗑️  Deleted: {last_session.get('deleted', 0)}")
         
         # Count actual files on disk
         actual_files = 0
@@ -1337,9 +1846,14 @@ class AKSWikiAssistant:
             print(f"⚠️  Mismatch detected! Progress log shows {len(downloaded_files)} but found {actual_files} files")
 
 
-    def rebuild_progress_from_existing_files(self, save_dir: str = "./downloaded_wiki/AKS") -> None:
-        """Rebuild progress log by scanning existing downloaded files"""
-        downloaded_files_log = os.path.join(save_dir, "download_progress.json")
+    def rebuild_progress_from_existing_files(self, save_dir: str = "./downloaded_wiki/AKS",
+                                             workers: int = 16) -> None:
+        """Rebuild progress log by scanning existing downloaded files.
+
+        Page bodies are hashed in parallel (mmap, header excluded) so the next
+        sync only fetches pages whose content really differs.
+        """
+        page_progress = self.catalog.download_progress(save_dir)
         
         print(f"\n🔧 Rebuilding progress log from existing files...")
         print(f"📁 Scanning directory: {save_dir}")
@@ -1358,7 +1872,18 @@ class AKSWikiAssistant:
         
         print(f"📄 Found {len(existing_files)} markdown files on disk")
         
-        # Build progress tracking with dummy hashes (we'll calculate real ones on next download)
+        # Hash page bodies in parallel; hashlib releases the GIL on large buffers
+        print(f"🔍 Hashing page bodies with {workers} workers...")
+        hash_start = time.time()
+        page_hashes = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for file_path, md5, sha1, error in pool.map(_hash_page_body, existing_files):
+                if error:
+                    print(f"    ❌ Error hashing {file_path}: {error}")
+                else:
+                    page_hashes[file_path] = (md5, sha1)
+        print(f"⚡ Hashed {len(page_hashes)} files in {time.time() - hash_start:.1f}s")
+        
         downloaded_files = {}
         
         print(f"🔍 Mapping files to ADO paths...")
@@ -1368,6 +1893,9 @@ class AKSWikiAssistant:
             if (i + 1) % 1000 == 0 or i < 10:
                 print(f"  Processing {i + 1}/{len(existing_files)}: {os.path.basename(file_path)}")
             
+            if file_path not in page_hashes:
+                continue
+            
             try:
                 # Convert file path back to ADO wiki path
                 relative_path = os.path.relpath(file_path, save_dir)
@@ -1379,31 +1907,28 @@ class AKSWikiAssistant:
                 else:
                     ado_path = f"/AKS/{relative_path}".replace(os.sep, '/')
                 
-                # Use dummy hash - will be updated on next download if content changed
-                downloaded_files[ado_path] = "existing_file"
+                # Real hashes - pages that were rewritten locally simply resync once
+                md5, sha1 = page_hashes[file_path]
+                downloaded_files[ado_path] = {'hash': md5, 'version': sha1}
                 
             except Exception as e:
                 print(f"    ❌ Error processing {file_path}: {e}")
         
         # Save the rebuilt progress
-        progress_data = {
-            'downloaded_files': downloaded_files,
-            'last_updated': time.time(),
-            'total_tracked': len(downloaded_files),
-            'completed': True,
-            'rebuilt_from_existing': True,
-            'rebuild_timestamp': time.time(),
-            'files_found_on_disk': len(existing_files)
-        }
-        
-        with open(downloaded_files_log, 'w') as f:
-            json.dump(progress_data, f, indent=2)
+        page_progress.rewrite(
+            downloaded_files,
+            last_updated=time.time(),
+            completed=True,
+            rebuilt_from_existing=True,
+            rebuild_timestamp=time.time(),
+            files_found_on_disk=len(existing_files)
+        )
         
         print(f"\n✅ Progress log rebuilt successfully!")
         print(f"📊 Summary:")
         print(f"   • Files on disk: {len(existing_files)}")
         print(f"   • Files mapped to ADO paths: {len(downloaded_files)}")
-        print(f"   • Progress log saved to: {downloaded_files_log}")
+        print(f"   • Progress log saved to: {page_progress.path}")
         print(f"\n💡 You can now run --download to sync any new/changed files")
 
     def resolve_ado_user_guids(self, content: str, organization: str, pat: str, cache: Dict[str, str] = None) -> str:
@@ -1411,25 +1936,15 @@ class AKSWikiAssistant:
         if cache is None:
             cache = {}
         
-        # Pattern to match ADO user GUIDs: @<GUID>
-        guid_pattern = r'@<([A-F0-9]{8}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{12})>'
-        
-        guids = re.findall(guid_pattern, content, re.IGNORECASE)
+        guids = ADO_USER_GUID_PATTERN.findall(content)
         if not guids:
             return content
         
-        auth = base64.b64encode(f":{pat}".encode()).decode()
-        headers = {"Authorization": f"Basic {auth}"}
+        # Resolve every unique GUID at once (in-memory cache, then disk cache, then one bulk API call)
+        names = self._resolve_identities(organization, pat, set(guids), cache)
         
-        # Process each unique GUID
-        for guid in set(guids):  # Use set to avoid duplicate API calls
-            if guid in cache:
-                # Use cached result
-                display_name = cache[guid]
-            else:
-                # Look up the user via ADO API
-                display_name = self._lookup_ado_user(organization, guid, headers)
-                cache[guid] = display_name
+        for guid in set(guids):
+            display_name = names.get(guid.lower())
             
             # Replace all occurrences of this GUID with the display name
             guid_pattern_specific = f'@<{guid}>'
@@ -1443,28 +1958,70 @@ class AKSWikiAssistant:
         
         return content
 
-    def _lookup_ado_user(self, organization: str, user_guid: str, headers: Dict[str, str]) -> str:
-        """Look up a single user GUID and return their display name"""
-        try:
-            # Use the working vssps identities API
-            url = f"https://vssps.dev.azure.com/{organization}/_apis/identities/{user_guid}?api-version=7.1"
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                # Extract the display name from providerDisplayName field
-                display_name = user_data.get('providerDisplayName', 'Unknown User')
-                return display_name
+    def _resolve_identities(self, organization: str, pat: str, guids, cache: Dict[str, str]) -> Dict[str, str]:
+        """Map lowercase GUIDs to display names ('Unknown User' if unresolvable), filling cache as it goes"""
+        names = {}
+        missing = set()
+        for guid in guids:
+            key = guid.lower()
+            if key in cache:
+                names[key] = cache[key]
             else:
-                print(f"  ⚠️  Could not resolve user {user_guid}: HTTP {response.status_code}")
-                
-        except Exception as e:
-            print(f"  ⚠️  Could not resolve user {user_guid}: {e}")
-        
-        return 'Unknown User'
+                missing.add(key)
+
+        if missing:
+            if self.identity_cache is None:
+                self.identity_cache = IdentityCache(os.path.join(CATALOG_DIR, IDENTITY_CACHE_FILE))
+            cached = self.identity_cache.get_many(missing)
+            missing -= set(cached)
+
+            looked_up = self._lookup_ado_users(organization, missing, self._get_ado_client(pat)) if missing else {}
+            self.identity_cache.put_many(looked_up)
+
+            for key, display_name in {**cached, **looked_up}.items():
+                cache[key] = display_name or 'Unknown User'
+                names[key] = cache[key]
+
+        return names
 
-    def resolve_guids_in_existing_files(self, organization: str, pat: str, wiki_dir: str) -> None:
-        """Process existing downloaded wiki files to resolve user GUIDs"""
+    def _lookup_ado_users(self, organization: str, user_guids, client: AdoClient) -> Dict[str, Optional[str]]:
+        """Bulk-resolve GUIDs through the identities API; unknown users map to None, failed batches are omitted"""
+        guids = sorted(user_guids)
+        results = {}
+        url = f"https://vssps.dev.azure.com/{organization}/_apis/identities"
+
+        for i in range(0, len(guids), ADO_IDENTITY_BATCH_SIZE):
+            batch = guids[i:i + ADO_IDENTITY_BATCH_SIZE]
+            try:
+                data = client.run(client.get_json(
+                    url, params={"identityIds": ",".join(batch), "api-version": "7.1"}, timeout=30
+                ))
+            except Exception as e:
+                print(f"  ⚠️  Could not resolve {len(batch)} user(s): {e}")
+                continue
+
+            for identity in data.get("value", []):
+                if identity and identity.get("id"):
+                    results[identity["id"].lower()] = identity.get("providerDisplayName")
+            # Anything ADO didn't return is unknown - cache that too
+            for guid in batch:
+                results.setdefault(guid, None)
+
+        return results
+
+    def _lookup_ado_user(self, organization: str, user_guid: str, client: AdoClient) -> str:
+        """Look up a single user GUID and return their display name"""
+        display_name = self._lookup_ado_users(organization, [user_guid.lower()], client).get(user_guid.lower())
+        return display_name or 'Unknown User'
+
+    def resolve_guids_in_existing_files(self, organization: str, pat: str, wiki_dir: str,
+                                        workers: Optional[int] = None) -> None:
+        """Process existing downloaded wiki files to resolve user GUIDs.
+
+        Phase one scans every file in a process pool to collect the unique GUIDs,
+        the whole set is then resolved in bulk, and phase two rewrites only the
+        affected files in parallel (atomic replace).
+        """
         print(f"\n🔄 Resolving user GUIDs in existing files...")
         print(f"📂 Directory: {wiki_dir}")
         
@@ -1472,10 +2029,11 @@ class AKSWikiAssistant:
             print(f"❌ Directory {wiki_dir} does not exist")
             return
         
-        # Count total markdown files
-        total_files = 0
+        # Collect markdown files
+        md_files = []
         for root, dirs, files in os.walk(wiki_dir):
-            total_files += sum(1 for file in files if file.endswith('.md'))
+            md_files.extend(os.path.join(root, file) for file in files if file.endswith('.md'))
+        total_files = len(md_files)
         
         print(f"📊 Found {total_files} markdown files to process")
         
@@ -1483,57 +2041,54 @@ class AKSWikiAssistant:
             print("ℹ️  No markdown files found")
             return
         
-        # Shared cache for user GUID lookups
+        # Phase 1: scan all files in parallel for GUID mentions
+        scan_start = time.time()
+        files_with_guids = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_path, guids, error in pool.map(_scan_file_guids, md_files, chunksize=64):
+                if error:
+                    print(f"  ❌ Error reading {os.path.relpath(file_path, wiki_dir)}: {error}")
+                elif guids:
+                    files_with_guids[file_path] = guids
+        
+        unique_guids = set().union(*files_with_guids.values()) if files_with_guids else set()
+        print(f"🔍 Found {len(unique_guids)} unique GUIDs in {len(files_with_guids)} files "
+              f"({time.time() - scan_start:.1f}s)")
+        
+        if not unique_guids:
+            print("ℹ️  No GUIDs to resolve")
+            return
+        
+        # Resolve the whole set at once
         user_cache = {}
-        files_processed = 0
+        names = self._resolve_identities(organization, pat, unique_guids, user_cache)
+        resolvable = {key for key, name in names.items() if name and name != 'Unknown User'}
+        affected_files = [
+            file_path for file_path, guids in files_with_guids.items()
+            if any(guid.lower() in resolvable for guid in guids)
+        ]
+        print(f"👥 Resolved {len(resolvable)}/{len(unique_guids)} users; {len(affected_files)} files to rewrite")
+        
+        # Phase 2: rewrite affected files in parallel
+        rewrite_start = time.time()
         files_modified = 0
         total_guids_resolved = 0
-        
-        for root, dirs, files in os.walk(wiki_dir):
-            for file in files:
-                if file.endswith('.md'):
-                    files_processed += 1
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        # Read the file
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            original_content = f.read()
-                        
-                        # Count GUIDs in this file
-                        guid_pattern = r'@<([A-F0-9]{8}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{4}-[A-F0-9]{12})>'
-                        guids_in_file = re.findall(guid_pattern, original_content, re.IGNORECASE)
-                        
-                        if guids_in_file:
-                            # Resolve GUIDs in content
-                            modified_content = self.resolve_ado_user_guids(
-                                original_content, organization, pat, user_cache
-                            )
-                            
-                            # Only write back if content actually changed
-                            if modified_content != original_content:
-                                with open(file_path, 'w', encoding='utf-8') as f:
-                                    f.write(modified_content)
-                                
-                                files_modified += 1
-                                unique_guids = len(set(guids_in_file))
-                                total_guids_resolved += unique_guids
-                                
-                                relative_path = os.path.relpath(file_path, wiki_dir)
-                                print(f"  ✅ [{files_processed}/{total_files}] {relative_path} - resolved {unique_guids} user(s)")
-                        
-                        # Show progress for files without GUIDs too
-                        elif files_processed % 50 == 0:
-                            relative_path = os.path.relpath(file_path, wiki_dir)
-                            print(f"  📄 [{files_processed}/{total_files}] {relative_path} - no GUIDs")
-                            
-                    except Exception as e:
-                        relative_path = os.path.relpath(file_path, wiki_dir)
-                        print(f"  ❌ Error processing {relative_path}: {e}")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_guid_rewriter,
+                                 initargs=(names,)) as pool:
+            for file_path, replaced, error in pool.map(_rewrite_file_guids, affected_files, chunksize=16):
+                relative_path = os.path.relpath(file_path, wiki_dir)
+                if error:
+                    print(f"  ❌ Error processing {relative_path}: {error}")
+                elif replaced:
+                    files_modified += 1
+                    total_guids_resolved += replaced
+                    if files_modified <= 20 or files_modified % 100 == 0:
+                        print(f"  ✅ [{files_modified}/{len(affected_files)}] {relative_path} - "
+                              f"resolved {replaced} mention(s)")
         
         print(f"\n✅ GUID Resolution Complete!")
-        print(f"📊 Files processed: {files_processed}")
-        print(f"📝 Files modified: {files_modified}")
+        print(f"📊 Files processed: {total_files}")
+        print(f"📝 Files modified: {files_modified} ({time.time() - rewrite_start:.1f}s)")
         print(f"👥 Unique users resolved: {len(user_cache)}")
         print(f"🔗 Total GUID references resolved: {total_guids_resolved}")
         
@@ -1571,10 +2126,8 @@ class AKSWikiAssistant:
             vector_store = self.client.beta.vector_stores.create(name="AKSWikiKnowledge_TEST")
             self.vector_store_id = vector_store.id
             
-            # Save vector store ID with test suffix
-            test_vector_file = "test_vector_store_id.json"
-            with open(test_vector_file, "w") as f:
-                json.dump({"vector_store_id": vector_store.id}, f)
+            # Save vector store ID as the test resource
+            self.catalog.set_resource(TEST_VECTOR_STORE, vector_store.id)
             print(f"💾 TEST Vector store created: {self.vector_store_id}")
             
         except Exception as e:
@@ -1626,21 +2179,14 @@ class AKSWikiAssistant:
         
         # Upload files in batches
         print(f"\n📤 Uploading {len(files_to_upload)} files...")
-        batch_size = 111  # Smaller batches for testing
+        for file_info in files_to_upload:
+            print(f"    📄 {file_info['relative_path']}")
         
-        for i in range(0, len(files_to_upload), batch_size):
-            batch = files_to_upload[i:i + batch_size]
-            batch_files = [file_info['path'] for file_info in batch]
-            
-            print(f"\n  📦 Batch {i//batch_size + 1}: uploading {len(batch)} files...")
-            for file_info in batch:
-                print(f"    📄 {file_info['relative_path']}")
-            
-            self._upload_batch(vector_store.id, batch_files, i + 1, i + len(batch))
+        self._upload_files(vector_store.id, [file_info['path'] for file_info in files_to_upload])
         
         print(f"\n✅ TEST vector store setup complete!")
         print(f"🆔 Vector Store ID: {self.vector_store_id}")
-        print(f"💾 Saved to: test_vector_store_id.json")
+        print(f"💾 Saved to: {self.catalog.db_path}")
         
         return self.vector_store_id
 
@@ -1648,15 +2194,12 @@ class AKSWikiAssistant:
         """Create or load test assistant"""
         print(f"\n🤖 Setting up TEST AI assistant...")
         
-        test_assistant_file = "test_assistant_id.json"
-        
         # Check if test assistant already exists
-        if os.path.exists(test_assistant_file):
-            with open(test_assistant_file, 'r') as f:
-                data = json.load(f)
-                self.assistant_id = data.get('assistant_id')
-                print(f"✅ Loaded existing TEST assistant: {self.assistant_id}")
-                return self.assistant_id
+        assistant_id = self.catalog.get_resource(TEST_ASSISTANT)
+        if assistant_id:
+            self.assistant_id = assistant_id
+            print(f"✅ Loaded existing TEST assistant: {self.assistant_id}")
+            return self.assistant_id
         
         # Create new test assistant
         print("🔧 Creating new TEST assistant...")
@@ -1680,8 +2223,7 @@ class AKSWikiAssistant:
             )
             
             # Save test assistant ID
-            with open(test_assistant_file, "w") as f:
-                json.dump({"assistant_id": assistant.id}, f)
+            self.catalog.set_resource(TEST_ASSISTANT, assistant.id)
             
             self.assistant_id = assistant.id
             print(f"✅ TEST Assistant created: {self.assistant_id}")
@@ -1695,58 +2237,37 @@ class AKSWikiAssistant:
         """Clean up test vector store and assistant"""
         print(f"\n🧹 Cleaning up TEST resources...")
         
-        # Load test resources
-        test_vector_file = "test_vector_store_id.json"
-        test_assistant_file = "test_assistant_id.json"
-        
         # Delete test vector store
-        if os.path.exists(test_vector_file):
-            with open(test_vector_file, 'r') as f:
-                data = json.load(f)
-                vector_store_id = data.get('vector_store_id')
-            
-            if vector_store_id:
-                try:
-                    self.client.beta.vector_stores.delete(vector_store_id)
-                    print(f"✅ Deleted TEST vector store: {vector_store_id}")
-                except Exception as e:
-                    print(f"❌ Error deleting TEST vector store: {e}")
+        vector_store_id = self.catalog.get_resource(TEST_VECTOR_STORE)
+        if vector_store_id:
+            try:
+                self.client.beta.vector_stores.delete(vector_store_id)
+                print(f"✅ Deleted TEST vector store: {vector_store_id}")
+            except Exception as e:
+                print(f"❌ Error deleting TEST vector store: {e}")
             
-            os.remove(test_vector_file)
-            print("✅ Removed test vector store file")
+            self.catalog.delete_resource(TEST_VECTOR_STORE)
+            print("✅ Removed test vector store from the catalog")
         
         # Delete test assistant
-        if os.path.exists(test_assistant_file):
-            with open(test_assistant_file, 'r') as f:
-                data = json.load(f)
-                assistant_id = data.get('assistant_id')
-            
-            if assistant_id:
-                try:
-                    self.client.beta.assistants.delete(assistant_id)
-                    print(f"✅ Deleted TEST assistant: {assistant_id}")
-                except Exception as e:
-                    print(f"❌ Error deleting TEST assistant: {e}")
+        assistant_id = self.catalog.get_resource(TEST_ASSISTANT)
+        if assistant_id:
+            try:
+                self.client.beta.assistants.delete(assistant_id)
+                print(f"✅ Deleted TEST assistant: {assistant_id}")
+            except Exception as e:
+                print(f"❌ Error deleting TEST assistant: {e}")
             
-            os.remove(test_assistant_file)
-            print("✅ Removed test assistant file")
+            self.catalog.delete_resource(TEST_ASSISTANT)
+            print("✅ Removed test assistant from the catalog")
         
         print(f"🎉 TEST cleanup complete!")
 
     def peek_test_vector_store(self) -> None:
         """Peek at files in the test vector store"""
-        test_vector_file = "test_vector_store_id.json"
-        
-        if not os.path.exists(test_vector_file):
-            print("❌ No test vector store found. Run --test-setup first.")
-            return
-        
-        with open(test_vector_file, 'r') as f:
-            data = json.load(f)
-            vector_store_id = data.get('vector_store_id')
-        
+        vector_store_id = self.catalog.get_resource(TEST_VECTOR_STORE)
         if not vector_store_id:
-            print("❌ No test vector store ID found")
+            print("❌ No test vector store found. Run --test-setup first.")
             return
         
         print(f"\n👀 Peeking into TEST vector store: {vector_store_id}")
@@ -1784,19 +2305,13 @@ class AKSWikiAssistant:
 
     def test_vector_store_search(self, query: str) -> None:
         """Test search functionality in the test vector store"""
-        test_vector_file = "test_vector_store_id.json"
-        test_assistant_file = "test_assistant_id.json"
+        vector_store_id = self.catalog.get_resource(TEST_VECTOR_STORE)
+        assistant_id = self.catalog.get_resource(TEST_ASSISTANT)
         
-        if not os.path.exists(test_vector_file) or not os.path.exists(test_assistant_file):
+        if not vector_store_id or not assistant_id:
             print("❌ Test resources not found. Run --test-setup first.")
             return
         
-        with open(test_vector_file, 'r') as f:
-            vector_store_id = json.load(f).get('vector_store_id')
-        
-        with open(test_assistant_file, 'r') as f:
-            assistant_id = json.load(f).get('assistant_id')
-        
         print(f"\n🔍 Testing search in vector store: {vector_store_id}")
         print(f"🤖 Using assistant: {assistant_id}")
         print(f"🔎 Query: {query}")
@@ -1810,6 +2325,7 @@ class AKSWikiAssistant:
                     }
                 }
             )
+            self.catalog.record_thread(thread.id, "test_vector_store_search")
             
             # Add the query
             self.client.beta.threads.messages.create(
@@ -1854,18 +2370,9 @@ class AKSWikiAssistant:
 
     def count_test_vector_store_files(self) -> None:
         """Count the true total number of files in the test vector store"""
-        test_vector_file = "test_vector_store_id.json"
-        
-        if not os.path.exists(test_vector_file):
-            print("❌ No test vector store found. Run --test-setup first.")
-            return
-        
-        with open(test_vector_file, 'r') as f:
-            data = json.load(f)
-            vector_store_id = data.get('vector_store_id')
-        
+        vector_store_id = self.catalog.get_resource(TEST_VECTOR_STORE)
         if not vector_store_id:
-            print("❌ No test vector store ID found")
+            print("❌ No test vector store found. Run --test-setup first.")
             return
         
         print(f"\n🔢 Counting files in TEST vector store: {vector_store_id}")
@@ -1914,52 +2421,308 @@ class AKSWikiAssistant:
             print(f"❌ Error counting files in vector store: {e}")
 
     # Add this new method to track uploaded files
-    def create_incremental_vector_store(self, wiki_path: str, subpath: str = "AKS") -> str:
-        """Create or load vector store with incremental file tracking"""
-        print(f"\n🗄️  Setting up incremental vector store...")
-        
-        # Files to track what's been uploaded
-        UPLOADED_FILES_LOG = "uploaded_files.json"
-        uploaded_files = {}
-        
+    def _load_incremental_vector_store(self) -> Optional[Dict[str, str]]:
+        """Load or create the vector store, returning the uploaded files tracking (None on failure)"""
         # Load existing vector store and uploaded files tracking
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                self.vector_store_id = data.get('vector_store_id')
-                
-            if os.path.exists(UPLOADED_FILES_LOG):
-                with open(UPLOADED_FILES_LOG, 'r') as f:
-                    uploaded_files = json.load(f)
+        vector_store_id = self.catalog.get_resource(VECTOR_STORE)
+        if vector_store_id:
+            self.vector_store_id = vector_store_id
+            uploaded_files = self.catalog.load_uploads()
             
             print(f"✅ Loaded existing vector store: {self.vector_store_id}")
             print(f"📋 Already uploaded: {len(uploaded_files)} files")
-        else:
-            # Create new vector store
-            print("🔌 Testing Azure OpenAI connection...")
-            try:
-                test_response = self.client.chat.completions.create(
-                    model=self.deployment_name,
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=10
-                )
-                print("✅ Connection successful")
-            except Exception as e:
-                print(f"❌ Connection failed: {e}")
-                return None
+            return uploaded_files
+
+        # Create new vector store
+        print("🔌 Testing Azure OpenAI connection...")
+        try:
+            test_response = self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=[{"role": "user", "content": "test"}],
+                max_tokens=10
+            )
+            print("✅ Connection successful")
+        except Exception as e:
+            print(f"❌ Connection failed: {e}")
+            return None
+
+        print("📦 Creating new vector store...")
+        try:
+            vector_store = self.client.beta.vector_stores.create(name="AKSWikiKnowledge")
+            self.vector_store_id = vector_store.id
+            
+            self.catalog.set_resource(VECTOR_STORE, vector_store.id)
+            # Anything tracked belonged to an earlier vector store
+            self.catalog.clear_uploads()
+            print(f"💾 Vector store created: {self.vector_store_id}")
+        except Exception as e:
+            print(f"❌ Failed to create vector store: {e}")
+            return None
+        
+        return {}
+
+    def _save_uploaded_files(self, uploaded_files: Dict[str, Dict]) -> None:
+        """Write manifest changes to the catalog in one transaction so a crash never loses the file IDs it tracks"""
+        self.catalog.save_uploads(uploaded_files)
+
+    def _detach_vector_store_file(self, file_id: str, vector_store_file_id: Optional[str] = None) -> bool:
+        """Remove a file from the vector store and delete the underlying upload"""
+        try:
+            self.client.beta.vector_stores.files.delete(
+                vector_store_id=self.vector_store_id, file_id=vector_store_file_id or file_id
+            )
+        except Exception as e:
+            # Already detached files can still be deleted
+            print(f"   ⚠️  Could not detach {file_id}: {e}")
+        try:
+            self.client.files.delete(file_id)
+            return True
+        except Exception as e:
+            print(f"   ❌ Error deleting {file_id}: {e}")
+            return False
 
-            print("📦 Creating new vector store...")
+    def _manifest_file_ids(self, entry: Dict):
+        """(file_id, vector_store_file_id) pairs a manifest entry holds in the vector store"""
+        if entry.get('file_id'):
+            yield entry['file_id'], entry.get('vector_store_file_id')
+        for section in entry.get('sections') or []:
+            yield section['file_id'], section.get('vector_store_file_id')
+
+    def _forget_page_files(self, entry: Dict) -> bool:
+        """Drop the section URL mappings and cached filenames of a manifest entry's uploads.
+
+        Returns whether any URL mappings were removed (and the mapping needs saving).
+        """
+        self.file_names.forget(file_id for file_id, _ in self._manifest_file_ids(entry))
+        section_names = [section['filename'] for section in entry.get('sections') or []]
+        for filename in section_names:
+            self.wiki_url_mapping.pop(filename, None)
+        return bool(section_names)
+
+    def _page_upload_items(self, file_path: str, relative_path: str, file_hash: str) -> List:
+        """Upload items for a page: the file itself, or one in-memory document per section if it is large.
+
+        Items are (source, relative_path, file_hash, part_count, section). Section
+        documents keep the page's online link, pointed at the section's heading
+        anchor, and their filenames are added to the wiki URL mapping so
+        citations deep-link to the section.
+        """
+        whole_page = [(file_path, relative_path, file_hash, 1, None)]
+        if os.path.getsize(file_path) < SECTION_SPLIT_THRESHOLD:
+            return whole_page
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            page_url, body = split_page_link(f.read())
+        sections = split_sections(body)
+        if len(sections) < 2:
+            return whole_page
+
+        page_filename = os.path.basename(file_path)
+        page_title = page_filename[:-3]
+        used_names = set()
+        items = []
+        for section in sections:
+            filename = section_filename(page_filename, section['title'], used_names)
+            section_url = page_url
+            if page_url and section['anchor']:
+                section_url = f"{page_url}&anchor={urllib.parse.quote(section['anchor'])}"
+            breadcrumb = " › ".join([page_title] + section['path'])
+            header = f"[View this page online]({section_url})\n\n" if section_url else ""
+            document = f"{header}**{breadcrumb}**\n\n{section['text']}"
+            if section_url:
+                self.wiki_url_mapping[filename] = section_url
+            items.append(((filename, document.encode('utf-8')), relative_path, file_hash, len(sections),
+                          {'filename': filename, 'anchor': section['anchor']}))
+        return items
+
+    def _tracked_uploader(self, uploaded_files: Dict[str, Dict], page_fields: Dict[str, Dict] = None,
+                          manifest_lock=None, **kwargs) -> VectorStoreUploader:
+        """Uploader for _page_upload_items items that keeps the manifest current.
+
+        A page is committed once all of its parts are indexed; only then are its
+        previous files removed, so the page is never missing from the vector
+        store. If any part still fails after the uploader's retries, the new parts
+        are dropped and the previous version stays. page_fields (relative path -> extra manifest fields such as
+        the dedup fingerprint and file stat) are stored with the committed entries.
+        Callers that change uploaded_files or page_fields while uploads run must
+        hold manifest_lock, which the batch callback takes for its own updates.
+        """
+        pending_pages = {}
+        page_fields = page_fields if page_fields is not None else {}
+        manifest_lock = manifest_lock or threading.RLock()
+
+        def on_batch_done(batch, file_batch, file_ids):
+            self._record_file_names(batch, file_batch, file_ids)
+            # The uploader has already retried failed files; a missing file ID is a final failure
+            finished_pages = []
+            for item, file_id in zip(batch, file_ids):
+                source, relative_path, file_hash, part_count, section = item
+                page = pending_pages.setdefault(relative_path, {'hash': file_hash, 'parts': [], 'ok': True})
+                page['parts'].append((file_id, section))
+                page['ok'] = page['ok'] and bool(file_id)
+                if len(page['parts']) == part_count:
+                    finished_pages.append((relative_path, pending_pages.pop(relative_path)))
+
+            for _, page in finished_pages:
+                if not page['ok']:
+                    # Parts still failing after retries - keep the previous version and retry on the next run
+                    for file_id, _ in page['parts']:
+                        if file_id:
+                            self._detach_vector_store_file(file_id)
+            indexed_pages = [(relative_path, page) for relative_path, page in finished_pages if page['ok']]
+            if not indexed_pages:
+                return
+
+            with manifest_lock:
+                replaced, live_names = self._commit_pages(uploaded_files, page_fields, indexed_pages)
+            for previous in replaced:
+                for file_id, vector_store_file_id in self._manifest_file_ids(previous):
+                    self._detach_vector_store_file(file_id, vector_store_file_id)
+                for section in previous.get('sections') or []:
+                    if section['filename'] not in live_names:
+                        self.wiki_url_mapping.pop(section['filename'], None)
+            if replaced:
+                print(f"    ♻️  Replaced {len(replaced)} previous page versions")
+
+        return VectorStoreUploader(self.client, self.vector_store_id, on_batch_done, **kwargs)
+
+    def _commit_pages(self, uploaded_files: Dict[str, Dict], page_fields: Dict[str, Dict], pages: List):
+        """Record fully indexed pages in the manifest and save it (caller holds the manifest lock).
+
+        Returns the previous entries they replace and the section filenames still live.
+        """
+        replaced = []
+        for relative_path, page in pages:
+            previous = uploaded_files.get(relative_path)
+            if previous and any(self._manifest_file_ids(previous)):
+                replaced.append(previous)
+            file_id, section = page['parts'][0]
+            if section is None:
+                uploaded_files[relative_path] = {
+                    'hash': page['hash'],
+                    'file_id': file_id,
+                    'vector_store_file_id': file_id,
+                }
+            else:
+                uploaded_files[relative_path] = {
+                    'hash': page['hash'],
+                    'file_id': None,
+                    'vector_store_file_id': None,
+                    'sections': [
+                        {'file_id': file_id, 'vector_store_file_id': file_id, **section}
+                        for file_id, section in page['parts']
+                    ],
+                }
+            uploaded_files[relative_path].update(page_fields.get(relative_path, {}))
+        self._save_uploaded_files(uploaded_files)
+
+        live_names = set()
+        if replaced:
+            live_names = {section['filename'] for entry in uploaded_files.values()
+                          for section in entry.get('sections') or []}
+        return replaced, live_names
+
+    def _duplicate_index(self, uploaded_files: Dict[str, Dict], root: str, exclude=()) -> DuplicateIndex:
+        """Index the manifest's canonical pages, fingerprinting older entries that lack one"""
+        def load_content(relative_path: str) -> Optional[str]:
             try:
-                vector_store = self.client.beta.vector_stores.create(name="AKSWikiKnowledge")
-                self.vector_store_id = vector_store.id
-                
-                with open(VECTOR_STORE_FILE, "w") as f:
-                    json.dump({"vector_store_id": vector_store.id}, f)
-                print(f"💾 Vector store created: {self.vector_store_id}")
-            except Exception as e:
-                print(f"❌ Failed to create vector store: {e}")
+                with open(os.path.join(root, relative_path), 'r', encoding='utf-8') as f:
+                    return f.read()
+            except OSError:
                 return None
 
+        # Near-duplicate candidates are confirmed against the canonical page's text on disk
+        index = DuplicateIndex(load_content=load_content)
+        backfilled = 0
+        for relative_path, entry in uploaded_files.items():
+            if relative_path in exclude or entry.get('alias_of'):
+                continue
+            if 'content_hash' not in entry:
+                try:
+                    with open(os.path.join(root, relative_path), 'r', encoding='utf-8') as f:
+                        entry.update(fingerprint(f.read()))
+                    backfilled += 1
+                except OSError:
+                    continue
+            index.add(relative_path, entry)
+        if backfilled:
+            print(f"   🧬 Fingerprinted {backfilled} previously uploaded pages")
+            self._save_uploaded_files(uploaded_files)
+        return index
+
+    def _dedup_page(self, index: DuplicateIndex, file_path: str, relative_path: str, file_hash: str,
+                    uploaded_files: Dict[str, Dict], page_fields: Dict[str, Dict]) -> bool:
+        """Record a page as an alias if it duplicates an indexed canonical page.
+
+        Returns True if the page was aliased (and must not be uploaded);
+        otherwise it becomes a canonical page in the index.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        page_fingerprint = fingerprint(content)
+        canonical = index.find(page_fingerprint, content)
+        fields = page_fields.setdefault(relative_path, {})
+        fields.update(page_fingerprint)
+        # Re-evaluated pages keep the stat their hash was taken from
+        for key in ('hash_algorithm', 'size', 'mtime_ns'):
+            if key in (uploaded_files.get(relative_path) or {}):
+                fields.setdefault(key, uploaded_files[relative_path][key])
+        if canonical is None or canonical == relative_path:
+            index.add(relative_path, page_fingerprint)
+            return False
+
+        previous = uploaded_files.get(relative_path) or {}
+        for file_id, vector_store_file_id in self._manifest_file_ids(previous):
+            self._detach_vector_store_file(file_id, vector_store_file_id)
+        # Citations of its old sections must not resolve to content that is no longer uploaded
+        self._forget_page_files(previous)
+        uploaded_files[relative_path] = {
+            'hash': file_hash,
+            'file_id': None,
+            'vector_store_file_id': None,
+            'alias_of': canonical,
+            'url': split_page_link(content)[0],
+            **fields,
+        }
+        # Pages that were duplicates of this one now point at its canonical copy
+        for entry in list(uploaded_files.values()):
+            if entry.get('alias_of') == relative_path:
+                entry['alias_of'] = canonical
+        return True
+
+    def _stale_aliases(self, uploaded_files: Dict[str, Dict], changed_paths) -> List[str]:
+        """Aliases whose canonical page is gone, changed or itself an alias, and must be re-evaluated"""
+        stale = []
+        for relative_path, entry in uploaded_files.items():
+            canonical = entry.get('alias_of')
+            if canonical and (canonical in changed_paths or canonical not in uploaded_files
+                              or uploaded_files[canonical].get('alias_of')):
+                stale.append(relative_path)
+        return stale
+
+    def _stat_fields(self, stat: os.stat_result, digest: str) -> Dict:
+        """Manifest fields that let an unchanged file skip hashing on the next run"""
+        return {'hash_algorithm': 'blake2b', 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+
+    def _stat_unchanged(self, entry: Optional[Dict], stat: os.stat_result) -> bool:
+        return bool(entry) and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+    def _content_unchanged(self, entry: Optional[Dict], digest: str, md5: Optional[str]) -> bool:
+        """Compare a file's hash against its manifest entry (md5 for entries from older runs)"""
+        if not entry:
+            return False
+        if entry.get('hash_algorithm') == 'blake2b':
+            return entry['hash'] == digest
+        return md5 is not None and entry['hash'] == md5
+
+    def create_incremental_vector_store(self, wiki_path: str, subpath: str = "AKS") -> str:
+        """Create or load vector store with incremental file tracking"""
+        print(f"\n🗄️  Setting up incremental vector store...")
+        
+        uploaded_files = self._load_incremental_vector_store()
+        if uploaded_files is None:
+            return None
+
         # Process files incrementally
         print(f"\n🔍 Scanning for new/changed files...")
         
@@ -1971,110 +2734,316 @@ class AKSWikiAssistant:
         new_files = []
         updated_files = []
         unchanged_files = []
+        seen_files = set()
+        page_fields = {}
+        scan_start = time.time()
         
+        # Files whose size and mtime match the manifest are unchanged without reading them
+        stats_to_hash = {}
         for root, dirs, files in os.walk(aks_path):
             for file in files:
                 if file.endswith('.md'):
                     file_path = os.path.join(root, file)
                     relative_path = os.path.relpath(file_path, aks_path)
-                    
-                    # Calculate file hash to detect changes
+                    seen_files.add(relative_path)
                     try:
-                        with open(file_path, 'rb') as f:
-                            file_hash = hashlib.md5(f.read()).hexdigest()
-                        
-                        if relative_path not in uploaded_files:
-                            new_files.append((file_path, relative_path, file_hash))
-                        elif uploaded_files[relative_path] != file_hash:
-                            updated_files.append((file_path, relative_path, file_hash))
-                        else:
-                            unchanged_files.append(relative_path)
-                            
-                    except Exception as e:
+                        stat = os.stat(file_path)
+                    except OSError as e:
                         print(f"❌ Error processing {file_path}: {e}")
+                        continue
+                    if self._stat_unchanged(uploaded_files.get(relative_path), stat):
+                        unchanged_files.append(relative_path)
+                    else:
+                        stats_to_hash[file_path] = (relative_path, stat)
+        
+        # Hash everything else in parallel
+        touched = 0
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            jobs = [(file_path, uploaded_files.get(relative_path, {}).get('hash_algorithm') is None)
+                    for file_path, (relative_path, stat) in stats_to_hash.items()]
+            for file_path, digest, md5, error in pool.map(lambda job: _hash_file(*job), jobs):
+                if error:
+                    print(f"❌ Error processing {file_path}: {error}")
+                    continue
+                relative_path, stat = stats_to_hash[file_path]
+                entry = uploaded_files.get(relative_path)
+                fields = self._stat_fields(stat, digest)
+                
+                if entry is None:
+                    new_files.append((file_path, relative_path, digest))
+                    page_fields[relative_path] = fields
+                elif not self._content_unchanged(entry, digest, md5):
+                    updated_files.append((file_path, relative_path, digest))
+                    page_fields[relative_path] = fields
+                else:
+                    # Same content with a new stat (or an md5 entry) - refresh the entry in place
+                    entry.update(fields)
+                    unchanged_files.append(relative_path)
+                    touched += 1
+        
+        if touched:
+            self._save_uploaded_files(uploaded_files)
+        print(f"⚡ Scanned {len(seen_files)} files in {time.time() - scan_start:.2f}s "
+              f"({len(stats_to_hash)} hashed)")
         
         print(f"\n📊 File Analysis:")
         print(f"   🆕 New files: {len(new_files)}")
         print(f"   🔄 Updated files: {len(updated_files)}")
         print(f"   ✅ Unchanged files: {len(unchanged_files)}")
         
+        # Tracked files no longer on disk were deleted or moved by the wiki sync
+        removed_files = [path for path in uploaded_files if path not in seen_files]
+        if removed_files:
+            print(f"   🗑️  Removed files: {len(removed_files)}")
+            self._delete_vector_store_files(removed_files, seen_files, uploaded_files)
+            for relative_path in removed_files:
+                del uploaded_files[relative_path]
+            self._save_uploaded_files(uploaded_files)
+            self._refresh_wiki_url_aliases(uploaded_files)
+        
         files_to_upload = new_files + updated_files
         
+        # Duplicates of a page whose content changed or went away must be re-evaluated
+        changed_paths = {relative_path for _, relative_path, _ in files_to_upload}
+        for relative_path in self._stale_aliases(uploaded_files, changed_paths):
+            if relative_path not in changed_paths:
+                files_to_upload.append((os.path.join(aks_path, relative_path), relative_path,
+                                        uploaded_files[relative_path]['hash']))
+        
         if not files_to_upload:
             print("🎉 All files are up to date!")
             return self.vector_store_id
         
+        # Upload one canonical copy of duplicated pages
+        index = self._duplicate_index(uploaded_files, aks_path, exclude=changed_paths)
+        canonical_files = []
+        for file_path, relative_path, file_hash in files_to_upload:
+            try:
+                if self._dedup_page(index, file_path, relative_path, file_hash, uploaded_files, page_fields):
+                    continue
+            except OSError as e:
+                print(f"❌ Error reading {file_path}: {e}")
+                continue
+            canonical_files.append((file_path, relative_path, file_hash))
+        duplicates = len(files_to_upload) - len(canonical_files)
+        if duplicates:
+            print(f"   🧬 Duplicates recorded as aliases: {duplicates}")
+        
         # Upload new/changed files
-        print(f"\n📤 Uploading {len(files_to_upload)} files...")
+        print(f"\n📤 Uploading {len(canonical_files)} files...")
         
-        batch_size = 50
-        uploaded_count = 0
+        uploader = self._tracked_uploader(uploaded_files, page_fields)
+        for file_path, relative_path, file_hash in canonical_files:
+            uploader.add(self._page_upload_items(file_path, relative_path, file_hash))
+        stats = uploader.wait()
         
-        for i in range(0, len(files_to_upload), batch_size):
-            batch = files_to_upload[i:i + batch_size]
-            batch_paths = [item[0] for item in batch]
-            
-            print(f"\n  📦 Batch {i//batch_size + 1}: {len(batch)} files")
-            
-            # Upload batch
-            try:
-                file_streams = [open(path, "rb") for path in batch_paths]
-                
-                file_batch = self.client.beta.vector_stores.file_batches.upload_and_poll(
-                    vector_store_id=self.vector_store_id,
-                    files=file_streams
-                )
-                
-                print(f"    ✅ Status: {file_batch.status}")
-                print(f"    📊 Completed: {file_batch.file_counts.completed}")
-                
-                # Update tracking for successfully uploaded files
-                if file_batch.status == 'completed':
-                    for file_path, relative_path, file_hash in batch:
-                        uploaded_files[relative_path] = file_hash
-                        uploaded_count += 1
-                
-                # Close file streams
-                for f in file_streams:
-                    f.close()
-                    
-            except Exception as e:
-                print(f"    ❌ Upload error: {e}")
-        
-        # Save updated tracking
-        with open(UPLOADED_FILES_LOG, 'w') as f:
-            json.dump(uploaded_files, f, indent=2)
+        # Save updated tracking, section deep links and alias URLs
+        self._save_uploaded_files(uploaded_files)
+        self._save_wiki_url_mapping()
+        self._refresh_wiki_url_aliases(uploaded_files)
         
         print(f"\n✅ Incremental upload complete!")
-        print(f"   📤 Uploaded: {uploaded_count} files")
+        print(f"   📤 Uploaded: {stats['completed']} files in {stats['batches']} batches "
+              f"(failed: {stats['failed']}, retried: {stats['retried']}, batch errors: {stats['errors']})")
         print(f"   📋 Total tracked: {len(uploaded_files)} files")
         
         return self.vector_store_id
 
+    def run_ingestion_pipeline(self, organization: str, project: str, wiki_name: str, pat: str,
+                               subpage_path: str, save_dir: str, max_workers: int = ADO_MAX_FETCH_WORKERS,
+                               batch_size: int = 50) -> Optional[str]:
+        """Download the wiki and upload changed pages to the vector store while the download runs.
+
+        The downloader hands every saved page through a queue to a hashing
+        thread that feeds the vector store uploader; a batch starts whenever
+        batch_size pages are ready or the download pauses, so wall-clock time
+        approaches the slower stage.
+        Files are tracked in the uploaded files log relative to save_dir.
+        """
+        print(f"\n🔀 Starting pipelined ingestion (download -> vector store)")
+        
+        uploaded_files = self._load_incremental_vector_store()
+        if uploaded_files is None:
+            return None
+
+        upload_queue = queue.Queue()
+        stop = object()
+        stats = {'queued': 0, 'skipped': 0, 'duplicates': 0, 'failed': 0}
+        hasher_error = []
+        changed_paths = set()
+        index = self._duplicate_index(uploaded_files, save_dir)
+        page_fields = {}
+        # The hasher and the uploader's batch callback both change the manifest
+        manifest_lock = threading.RLock()
+        # Partial batches go out once the downloader has been quiet for PIPELINE_FLUSH_SECONDS
+        uploader = self._tracked_uploader(uploaded_files, page_fields, manifest_lock,
+                                          batch_size=batch_size, max_linger=PIPELINE_FLUSH_SECONDS)
+
+        def hash_page(file_path: str) -> None:
+            relative_path = os.path.relpath(file_path, save_dir)
+            with manifest_lock:
+                entry = uploaded_files.get(relative_path)
+                legacy_md5 = bool(entry) and not entry.get('hash_algorithm')
+            _, file_hash, md5, error = _hash_file(file_path, legacy_md5=legacy_md5)
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                error = error or str(e)
+            if error:
+                print(f"    ❌ Error reading {relative_path}: {error}")
+                stats['failed'] += 1
+                return
+            fields = self._stat_fields(stat, file_hash)
+            with manifest_lock:
+                # The batch callback may have committed a new entry since it was read
+                entry = uploaded_files.get(relative_path)
+                if self._content_unchanged(entry, file_hash, md5):
+                    entry.update(fields)
+                    stats['skipped'] += 1
+                    return
+                page_fields[relative_path] = fields
+                changed_paths.add(relative_path)
+                try:
+                    if self._dedup_page(index, file_path, relative_path, file_hash, uploaded_files, page_fields):
+                        stats['duplicates'] += 1
+                        return
+                except OSError as e:
+                    print(f"    ❌ Error reading {relative_path}: {e}")
+                    stats['failed'] += 1
+                    return
+            uploader.add(self._page_upload_items(file_path, relative_path, file_hash))
+
+        def hasher():
+            try:
+                while True:
+                    file_path = upload_queue.get()
+                    if file_path is stop:
+                        break
+                    try:
+                        hash_page(file_path)
+                    except Exception as e:
+                        stats['failed'] += 1
+                        print(f"    ❌ Error processing {os.path.relpath(file_path, save_dir)}: {e}")
+            except BaseException as e:
+                hasher_error.append(e)
+                raise
+
+        def enqueue(file_path: str) -> None:
+            stats['queued'] += 1
+            upload_queue.put(file_path)
+
+        start_time = time.time()
+        upload_thread = threading.Thread(target=hasher, name="pipeline-hasher", daemon=True)
+        upload_thread.start()
+        try:
+            self.download_ado_wiki_incremental(
+                organization, project, wiki_name, pat, subpage_path, save_dir,
+                max_workers=max_workers, on_page_saved=enqueue
+            )
+        finally:
+            upload_queue.put(stop)
+            print(f"\n⏳ Waiting for the uploader to drain {max(upload_queue.qsize() - 1, 0)} queued pages...")
+            upload_thread.join()
+            upload_stats = uploader.wait()
+            self._save_uploaded_files(uploaded_files)
+            self._save_wiki_url_mapping()
+        if hasher_error:
+            raise RuntimeError("Pipeline hasher stopped before the download finished") from hasher_error[0]
+
+        # Pages the sync deleted or moved away are no longer on disk
+        live_files = {
+            os.path.relpath(os.path.join(root, file), save_dir)
+            for root, dirs, files in os.walk(save_dir) for file in files if file.endswith('.md')
+        }
+        removed_files = [path for path in uploaded_files if path not in live_files]
+        if removed_files:
+            print(f"\n🗑️  Removing {len(removed_files)} files no longer in the wiki")
+            self._delete_vector_store_files(removed_files, live_files, uploaded_files)
+            for relative_path in removed_files:
+                del uploaded_files[relative_path]
+            self._save_uploaded_files(uploaded_files)
+
+        # Duplicates of pages that changed or went away get their own evaluation
+        stale_aliases = [path for path in self._stale_aliases(uploaded_files, changed_paths)
+                         if path not in changed_paths]
+        if stale_aliases:
+            print(f"\n🧬 Re-evaluating {len(stale_aliases)} duplicate pages")
+            index = self._duplicate_index(uploaded_files, save_dir, exclude=set(stale_aliases))
+            uploader = self._tracked_uploader(uploaded_files, page_fields, manifest_lock)
+            for relative_path in stale_aliases:
+                file_path = os.path.join(save_dir, relative_path)
+                with manifest_lock:
+                    file_hash = uploaded_files[relative_path]['hash']
+                    aliased = self._dedup_page(index, file_path, relative_path, file_hash, uploaded_files, page_fields)
+                if not aliased:
+                    uploader.add(self._page_upload_items(file_path, relative_path, file_hash))
+            uploader.wait()
+            self._save_uploaded_files(uploaded_files)
+            self._save_wiki_url_mapping()
+        self._refresh_wiki_url_aliases(uploaded_files)
+
+        print(f"\n✅ Pipelined ingestion complete in {time.time() - start_time:.1f}s")
+        print(f"   📥 Pages handed to uploader: {stats['queued']}")
+        print(f"   📤 Uploaded: {upload_stats['completed']} files in {upload_stats['batches']} batches "
+              f"(failed: {upload_stats['failed']}, retried: {upload_stats['retried']}, batch errors: {upload_stats['errors']})")
+        print(f"   ✅ Already up to date: {stats['skipped']}")
+        print(f"   🧬 Duplicates recorded as aliases: {stats['duplicates']}")
+        print(f"   ❌ Failed to process: {stats['failed']}")
+        print(f"   📋 Total tracked: {len(uploaded_files)} files")
+        return self.vector_store_id
+
+    def _delete_vector_store_files(self, relative_paths: List[str], live_paths,
+                                   uploaded_files: Dict[str, Dict]) -> int:
+        """Detach and delete the vector store files uploaded for pages that no longer exist locally"""
+        file_ids = [ids for path in relative_paths for ids in self._manifest_file_ids(uploaded_files[path])]
+        if any([self._forget_page_files(uploaded_files[path]) for path in relative_paths]):
+            self._save_wiki_url_mapping()
+        
+        # Legacy entries are only known by filename, so a name still used by a live page is ambiguous
+        legacy_paths = [path for path in relative_paths
+                        if not uploaded_files[path].get('alias_of')
+                        and not any(self._manifest_file_ids(uploaded_files[path]))]
+        live_names = {os.path.basename(path) for path in live_paths}
+        names = {os.path.basename(path) for path in legacy_paths}
+        ambiguous = names & live_names
+        names -= ambiguous
+        if ambiguous:
+            print(f"   ⚠️  Skipping {len(ambiguous)} removed files whose name is shared with a live page")
+        
+        if names:
+            try:
+                store_file_ids = {
+                    f.id for f in self.client.beta.vector_stores.files.list(vector_store_id=self.vector_store_id, limit=100)
+                }
+                file_ids.extend((f.id, None) for f in self.client.files.list(purpose="assistants")
+                                if f.id in store_file_ids and f.filename in names)
+            except Exception as e:
+                print(f"   ❌ Could not list vector store files: {e}")
+        
+        deleted = sum(1 for file_id, vector_store_file_id in file_ids
+                      if self._detach_vector_store_file(file_id, vector_store_file_id))
+        
+        print(f"   🗑️  Deleted {deleted} stale files from the vector store")
+        return deleted
+
     def generate_response(self, question: str, context: str = ""):
         """Generate a streaming response to a question"""
         try:
-            # Create a temporary thread for this question
-            thread = self.client.beta.threads.create(
-                tool_resources={
-                    "file_search": {
-                        "vector_store_ids": [self.vector_store_id]
-                    }
-                }
-            )
+            # Lease a temporary thread for this question (registered for the reaper)
+            thread_id = self.lease_thread("generate_response")
             
             # Add the question with context
             full_question = f"{question}\n\nContext: {context}" if context else question
             
             self.client.beta.threads.messages.create(
-                thread_id=thread.id,
+                thread_id=thread_id,
                 role="user",
                 content=full_question
             )
             
             # Run the assistant with streaming
             run = self.client.beta.threads.runs.create(
-                thread_id=thread.id,
+                thread_id=thread_id,
                 assistant_id=self.assistant_id,
                 instructions="""You are a Microsoft Azure Kubernetes Service (AKS) support engineer. 
 
@@ -2092,31 +3061,10 @@ Format: Technical explanation, specific steps, relevant links.""",
                 stream=True
             )
             
-            response_content = ""
-            
-            for event in run:
-                if event.event == 'thread.message.delta':
-                    for content in event.data.delta.content:
-                        if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                            chunk = content.text.value
-                            response_content += chunk
-                            yield chunk
-                elif event.event == 'thread.run.completed':
-                    # Process final content with citations
-                    messages = self.client.beta.threads.messages.list(thread_id=thread.id)
-                    for message in messages:
-                        if message.role == "assistant":
-                            for content in message.content:
-                                if hasattr(content, 'text'):
-                                    text_content = content.text.value
-                                    annotations = getattr(content.text, 'annotations', [])
-                                    final_content = self.process_citations(text_content, annotations)
-                                    
-                                    # Send any remaining content
-                                    if len(final_content) > len(response_content):
-                                        remaining = final_content[len(response_content):]
-                                        yield remaining
-                                    return
+            # Citations are resolved from the stream's annotations as they arrive
+            for event in self.stream_answer(run):
+                if event['type'] in ('content', 'sources'):
+                    yield event['content']
             
         except Exception as e:
             yield f"Error generating response: {str(e)}"
@@ -2142,13 +3090,7 @@ Format: Technical explanation, specific steps, relevant links.""",
         print(f"💾 Downloaded size: {downloaded_size / 1024 / 1024:.2f} MB")
         
         # Check vector store files
-        uploaded_files_log = "uploaded_files.json"
-        uploaded_count = 0
-        
-        if os.path.exists(uploaded_files_log):
-            with open(uploaded_files_log, 'r') as f:
-                uploaded_files = json.load(f)
-                uploaded_count = len(uploaded_files)
+        uploaded_count = self.catalog.upload_count()
         
         print(f"☁️  Uploaded to vector store: {uploaded_count}")
         
@@ -2168,6 +3110,11 @@ def main():
     parser.add_argument("--peek", action="store_true", help="Peek at vector store contents")
     parser.add_argument("--delete", action="store_true", help="Delete vector store and assistant")
     parser.add_argument("--download", action="store_true", help="Download wiki from ADO")
+    parser.add_argument("--download-workers", type=int, default=ADO_MAX_FETCH_WORKERS,
+                       help=f"Most concurrent page fetches during --download/--pipeline; starts at "
+                            f"{ADO_FETCH_WORKERS} and adapts to throttling (default: {ADO_MAX_FETCH_WORKERS})")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Download wiki from ADO and upload changed pages to the vector store concurrently")
     # Add a new command to check download status
     parser.add_argument("--check-download", action="store_true", help="Check download progress")
     parser.add_argument("--rebuild-progress", action="store_true", help="Rebuild progress log from existing files")
@@ -2185,6 +3132,8 @@ def main():
     parser.add_argument("--test-search", type=str, help="Test search functionality in test vector store")
     # Add to parser arguments:
     parser.add_argument("--check-coverage", action="store_true", help="Check wiki coverage and upload status")
+    parser.add_argument("--export-state", action="store_true",
+                        help="Export resource IDs and the wiki URL mapping from the catalog to their JSON files before a deploy")
     parser.add_argument("--incremental-setup", action="store_true", help="Setup vector store with incremental upload tracking")
     parser.add_argument("--count-test-files", action="store_true", help="Count total files in test vector store")
     parser.add_argument("--test-response", action="store_true", help="Test AI response against human response")
@@ -2197,6 +3146,13 @@ def main():
 
     args = parser.parse_args()
     
+    # Deploys ship the JSON files rather than the gitignored catalog; no Azure access needed
+    if args.export_state:
+        catalog = WikiCatalog.shared(os.path.join(CATALOG_DIR, CATALOG_FILE), legacy_dir=CATALOG_DIR)
+        for path in catalog.export_json():
+            print(f"💾 Exported {os.path.relpath(path)}")
+        return
+    
     # Check environment variables
     if not os.getenv("AZURE_OPENAI_API_KEY") or not os.getenv("AZURE_OPENAI_ENDPOINT"):
         print("❌ Please set AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT environment variables")
@@ -2211,15 +3167,8 @@ def main():
             sys.exit(1)
         
         # Load assistant
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.vector_store_id = data.get('vector_store_id')
-        
-        if os.path.exists(ASSISTANT_ID_FILE):
-            with open(ASSISTANT_ID_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.assistant_id = data.get('assistant_id')
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        assistant.assistant_id = assistant.catalog.get_resource(ASSISTANT)
         
         if not assistant.vector_store_id or not assistant.assistant_id:
             print("❌ Please set up the assistant first with --setup")
@@ -2239,15 +3188,8 @@ def main():
     
     if args.run_evaluation_suite:
         # Load assistant
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.vector_store_id = data.get('vector_store_id')
-        
-        if os.path.exists(ASSISTANT_ID_FILE):
-            with open(ASSISTANT_ID_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.assistant_id = data.get('assistant_id')
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        assistant.assistant_id = assistant.catalog.get_resource(ASSISTANT)
         
         if not assistant.vector_store_id or not assistant.assistant_id:
             print("❌ Please set up the assistant first with --setup")
@@ -2273,12 +3215,10 @@ def main():
         #     print(f"💡 Make sure you've downloaded the wiki first using --download")
         #     sys.exit(1)
         
-        # Load vector store from file
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.vector_store_id = data['vector_store_id']
-                print(f"✅ Using existing vector store: {assistant.vector_store_id}")
+        # Load vector store from the catalog
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        if assistant.vector_store_id:
+            print(f"✅ Using existing vector store: {assistant.vector_store_id}")
         else:
             print("❌ No vector store found. Run --setup first.")
             sys.exit(1)
@@ -2291,19 +3231,13 @@ def main():
     # Handle test questions
     if args.test_ask or args.test_interactive:
         # Load test assistant
-        test_vector_file = "test_vector_store_id.json"
-        test_assistant_file = "test_assistant_id.json"
+        assistant.vector_store_id = assistant.catalog.get_resource(TEST_VECTOR_STORE)
+        assistant.assistant_id = assistant.catalog.get_resource(TEST_ASSISTANT)
         
-        if not os.path.exists(test_vector_file) or not os.path.exists(test_assistant_file):
+        if not assistant.vector_store_id or not assistant.assistant_id:
             print("❌ Test resources not found. Run --test-setup first.")
             sys.exit(1)
         
-        with open(test_vector_file, 'r') as f:
-            assistant.vector_store_id = json.load(f).get('vector_store_id')
-        
-        with open(test_assistant_file, 'r') as f:
-            assistant.assistant_id = json.load(f).get('assistant_id')
-        
         if args.test_ask:
             print("🧪 Using TEST assistant...")
             assistant.ask_question(args.test_ask)
@@ -2381,8 +3315,23 @@ def main():
             wiki_name="CloudNativeCompute.wiki",
             pat=os.getenv("AZURE_DEVOPS_PAT", "your_pat_here"),
             subpage_path="/AKS",
-            save_dir="./downloaded_wiki/AKS"
+            save_dir="./downloaded_wiki/AKS",
+            max_workers=args.download_workers
+        )
+        return
+    
+    if args.pipeline:
+        assistant.run_ingestion_pipeline(
+            organization="msazure",
+            project="CloudNativeCompute",
+            wiki_name="CloudNativeCompute.wiki",
+            pat=os.getenv("AZURE_DEVOPS_PAT", "your_pat_here"),
+            subpage_path="/AKS",
+            save_dir="./downloaded_wiki/AKS",
+            max_workers=args.download_workers
         )
+        if assistant.vector_store_id:
+            assistant.create_or_load_assistant()
         return
     
     if args.resolve_guids:
@@ -2395,11 +3344,9 @@ def main():
 
     if args.peek:
         # Just load the existing vector store ID
-        if os.path.exists(VECTOR_STORE_FILE):
-            with open(VECTOR_STORE_FILE, 'r') as f:
-                data = json.load(f)
-                assistant.vector_store_id = data.get('vector_store_id')
-                assistant.peek_vector_store()
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        if assistant.vector_store_id:
+            assistant.peek_vector_store()
         else:
             print("❌ No vector store found. Run --setup first.")
         return
@@ -2,6 +2,8 @@ from flask_cors import CORS
 import os
 from ai_grader import AIResponseGrader, AKSResponseTester
 from aks import AKSWikiAssistant
+from thread_reaper import ThreadReaper
+from wiki_catalog import ASSISTANT, VECTOR_STORE
 import json
 import traceback
 from flask import Flask, request, jsonify, Response
@@ -23,13 +25,12 @@ def initialize_components():
         tester = AKSResponseTester(assistant, grader)
         
         # Load existing vector store and assistant
-        if os.path.exists("vector_store_id.json"):
-            with open("vector_store_id.json", 'r') as f:
-                assistant.vector_store_id = json.load(f)["vector_store_id"]
-        
-        if os.path.exists("assistant_id.json"):
-            with open("assistant_id.json", 'r') as f:
-                assistant.assistant_id = json.load(f)["assistant_id"]
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        assistant.assistant_id = assistant.catalog.get_resource(ASSISTANT)
+        if assistant.vector_store_id:
+            assistant.thread_pool.warm(assistant.vector_store_id)
+        # Delete expired answer threads in the background
+        ThreadReaper.shared(assistant.client, assistant.catalog).start()
         
         print("✅ Components initialized successfully")
         return True
@@ -39,7 +40,10 @@ def initialize_components():
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "AKS Grader API is running"})
+    health = {"status": "healthy", "message": "AKS Grader API is running"}
+    if assistant:
+        health["threads"] = ThreadReaper.shared(assistant.client, assistant.catalog).metrics()
+    return jsonify(health)
 
 @app.route('/api/evaluate', methods=['POST'])
 def evaluate_response():
@@ -161,27 +165,21 @@ def generate_ai_response_stream():
         
         def generate():
             try:
-                # Create a temporary thread for this question
-                thread = assistant.client.beta.threads.create(
-                    tool_resources={
-                        "file_search": {
-                            "vector_store_ids": [assistant.vector_store_id]
-                        }
-                    }
-                )
+                # Lease a temporary thread for this question (pre-created with the vector store attached)
+                thread_id = assistant.lease_thread("/api/generate-ai-response-stream")
                 
                 # Add the question with context
                 full_question = f"{question}\n\nContext: {context}" if context else question
                 
                 assistant.client.beta.threads.messages.create(
-                    thread_id=thread.id,
+                    thread_id=thread_id,
                     role="user",
                     content=full_question
                 )
                 
                 # Run the assistant with streaming
                 run = assistant.client.beta.threads.runs.create(
-                    thread_id=thread.id,
+                    thread_id=thread_id,
                     assistant_id=assistant.assistant_id,
                     instructions="""You are an expert in AKS (Azure Kubernetes Service) support. 
                     Provide a comprehensive, technically accurate response to this customer question.
@@ -192,33 +190,11 @@ def generate_ai_response_stream():
                     stream=True
                 )
                 
-                response_content = ""
+                # Citations are resolved from the stream's annotations as they arrive
+                for event in assistant.stream_answer(run):
+                    yield f"data: {json.dumps(dict(event, done=False))}\n\n"
                 
-                for event in run:
-                    if event.event == 'thread.message.delta':
-                        for content in event.data.delta.content:
-                            if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                                chunk = content.text.value
-                                response_content += chunk
-                                yield f"data: {json.dumps({'content': chunk, 'done': False})}\n\n"
-                    elif event.event == 'thread.run.completed':
-                        # Process final content with citations
-                        messages = assistant.client.beta.threads.messages.list(thread_id=thread.id)
-                        for message in messages:
-                            if message.role == "assistant":
-                                for content in message.content:
-                                    if hasattr(content, 'text'):
-                                        text_content = content.text.value
-                                        annotations = getattr(content.text, 'annotations', [])
-                                        final_content = assistant.process_citations(text_content, annotations)
-                                        
-                                        # Send any remaining content
-                                        if len(final_content) > len(response_content):
-                                            remaining = final_content[len(response_content):]
-                                            yield f"data: {json.dumps({'content': remaining, 'done': False})}\n\n"
-                                        
-                                        yield f"data: {json.dumps({'content': '', 'done': True})}\n\n"
-                                        return
+                yield f"data: {json.dumps({'content': '', 'done': True})}\n\n"
                 
             except Exception as e:
                 yield f"data: {json.dumps({'error': str(e), 'done': True})}\n\n"
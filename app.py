@@ -16,6 +16,8 @@ CORS(app)
 # Import all the API functionality
 from ai_grader import AIResponseGrader, AKSResponseTester
 from aks import AKSWikiAssistant
+from thread_reaper import ThreadReaper
+from wiki_catalog import ASSISTANT, VECTOR_STORE
 # Initialize components
 assistant = None
 grader = None
@@ -72,23 +74,26 @@ def initialize_components():
         prd_agent = PRDAgent(wiki_assistant=assistant)
         blog_agent = BlogAgent(wiki_assistant=assistant)  # Add this line
         
-        # Load existing vector store and assistant IDs
-        if os.path.exists("vector_store_id.json"):
-            with open("vector_store_id.json", 'r') as f:
-                assistant.vector_store_id = json.load(f)["vector_store_id"]
-                print(f"✅ Loaded vector store: {assistant.vector_store_id}")
+        # Load existing vector store and assistant IDs from the catalog
+        assistant.vector_store_id = assistant.catalog.get_resource(VECTOR_STORE)
+        if assistant.vector_store_id:
+            print(f"✅ Loaded vector store: {assistant.vector_store_id}")
         else:
-            print("❌ No vector_store_id.json found")
+            print(f"❌ No vector store in {assistant.catalog.db_path}")
             return False
         
-        if os.path.exists("assistant_id.json"):
-            with open("assistant_id.json", 'r') as f:
-                assistant.assistant_id = json.load(f)["assistant_id"]
-                print(f"✅ Loaded assistant: {assistant.assistant_id}")
+        assistant.assistant_id = assistant.catalog.get_resource(ASSISTANT)
+        if assistant.assistant_id:
+            print(f"✅ Loaded assistant: {assistant.assistant_id}")
         else:
-            print("❌ No assistant_id.json found")
+            print(f"❌ No assistant in {assistant.catalog.db_path}")
             return False
         
+        # Pre-create threads so answers don't wait on threads.create
+        assistant.thread_pool.warm(assistant.vector_store_id)
+        # Delete expired answer threads in the background
+        ThreadReaper.shared(assistant.client, assistant.catalog).start()
+        
         print("✅ Components initialized successfully")
         return True
     except Exception as e:
@@ -99,7 +104,10 @@ def initialize_components():
     
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "AKSAI Hub API is running"})
+    health = {"status": "healthy", "message": "AKSAI Hub API is running"}
+    if assistant:
+        health["threads"] = ThreadReaper.shared(assistant.client, assistant.catalog).metrics()
+    return jsonify(health)
 
 @app.route('/api/parse-email', methods=['POST'])
 def parse_email():
@@ -146,6 +154,8 @@ def generate_response():
         data = request.json
         question = data.get('question', '')
         context = data.get('context', '')
+        # Follow-ups that pass a session ID continue its conversation; otherwise each answer stands alone
+        session_id = data.get('session_id') or request.headers.get('X-Session-Id')
         
         if not question:
             return jsonify({"error": "Question is required"}), 400
@@ -163,8 +173,10 @@ def generate_response():
                 full_question = f"{question}\n\nContext: {context}" if context else question
                 
                 # Use streaming version
-                for chunk in assistant.ask_question(full_question, stream=True):
-                    yield f"data: {json.dumps({'content': chunk})}\n\n"
+                # Content, citation and sources events; citations arrive as soon as they are resolved
+                for event in assistant.ask_question(full_question, stream=True, events=True,
+                                                      session_id=session_id, owner="/api/generate-response"):
+                    yield f"data: {json.dumps(event)}\n\n"
                 
                 yield "data: {\"status\": \"complete\"}\n\n"
                 
@@ -585,7 +597,7 @@ Focus on finding 2-3 most relevant experts based on the technical domain of the
             
             try:
                 # Use the assistant to find relevant assignees
-                for chunk in assistant.ask_question(assignee_prompt, stream=True):
+                for chunk in assistant.ask_question(assignee_prompt, stream=True, owner="/api/suggest-assignees"):
                     yield f"data: {json.dumps({'content': chunk})}\n\n"
                 
                 yield "data: {\"status\": \"complete\"}\n\n"
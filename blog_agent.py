@@ -2,12 +2,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-import json
 import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 from openai import AzureOpenAI
 from aks import AKSWikiAssistant
+from wiki_catalog import ASSISTANT, VECTOR_STORE
 from azure.ai.projects import AIProjectClient
 from azure.ai.agents.models import MessageRole, BingGroundingTool
 from azure.identity import DefaultAzureCredential
@@ -87,15 +87,11 @@ class BlogAgent:
             print(f"🔍 Searching wiki for blog research: {query[:100]}...")
             
             # Ensure IDs are loaded
-            if not hasattr(self.wiki_assistant, 'vector_store_id') or not self.wiki_assistant.vector_store_id:
-                if os.path.exists("vector_store_id.json"):
-                    with open("vector_store_id.json", 'r') as f:
-                        self.wiki_assistant.vector_store_id = json.load(f)["vector_store_id"]
+            if not getattr(self.wiki_assistant, 'vector_store_id', None):
+                self.wiki_assistant.vector_store_id = self.wiki_assistant.catalog.get_resource(VECTOR_STORE)
                         
-            if not hasattr(self.wiki_assistant, 'assistant_id') or not self.wiki_assistant.assistant_id:
-                if os.path.exists("assistant_id.json"):
-                    with open("assistant_id.json", 'r') as f:
-                        self.wiki_assistant.assistant_id = json.load(f)["assistant_id"]
+            if not getattr(self.wiki_assistant, 'assistant_id', None):
+                self.wiki_assistant.assistant_id = self.wiki_assistant.catalog.get_resource(ASSISTANT)
             
             # Use the wiki assistant with a blog-specific query
             search_query = f"Find technical information and examples for blog writing about: {query[:200]}. Include specific details, best practices, and real-world usage."
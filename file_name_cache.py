@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from wiki_catalog import WikiCatalog
+
+# Entries kept in the catalog and in memory (least recently used are evicted first)
+FILE_NAME_CACHE_SIZE = 50000
+MEMORY_CACHE_SIZE = 4096
+# Parallel files.retrieve calls for IDs missing from the cache
+RESOLVE_WORKERS = 8
+
+class FileNameCache:
+    """Process-wide cache of uploaded file ID -> filename for rendering citations.
+
+    Filenames are recorded when files are uploaded, so citations normally
+    resolve from memory or the catalog; the IDs that still miss are
+    retrieved from the API in parallel and remembered.
+    """
+
+    _shared: Dict[str, "FileNameCache"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, catalog: WikiCatalog) -> "FileNameCache":
+        """The process-wide cache backed by catalog"""
+        with cls._shared_lock:
+            if catalog.db_path not in cls._shared:
+                cls._shared[catalog.db_path] = cls(catalog)
+            return cls._shared[catalog.db_path]
+
+    def __init__(self, catalog: WikiCatalog, max_entries: int = FILE_NAME_CACHE_SIZE,
+                 memory_entries: int = MEMORY_CACHE_SIZE):
+        self.catalog = catalog
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, file_names: Dict[str, str]) -> None:
+        with self._lock:
+            for file_id, filename in file_names.items():
+                self._memory[file_id] = filename
+                self._memory.move_to_end(file_id)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def put_many(self, file_names: Dict[str, str]) -> None:
+        """Record filenames of newly uploaded files"""
+        self._remember(file_names)
+        self.catalog.put_file_names(file_names, self.max_entries)
+
+    def forget(self, file_ids: Iterable[str]) -> None:
+        """Drop removed files so their citations no longer resolve"""
+        file_ids = list(file_ids)
+        with self._lock:
+            for file_id in file_ids:
+                self._memory.pop(file_id, None)
+        self.catalog.forget_file_names(file_ids)
+
+    def get_many(self, file_ids: Iterable[str]) -> Dict[str, str]:
+        """Cached filenames (memory first, then the catalog)"""
+        found, missing = {}, []
+        with self._lock:
+            for file_id in dict.fromkeys(file_ids):
+                if file_id in self._memory:
+                    self._memory.move_to_end(file_id)
+                    found[file_id] = self._memory[file_id]
+                else:
+                    missing.append(file_id)
+        if missing:
+            stored = self.catalog.get_file_names(missing)
+            self._remember(stored)
+            found.update(stored)
+        return found
+
+    def resolve(self, client, file_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Filenames for file_ids, retrieving cache misses in parallel (None if a lookup fails)"""
+        file_ids = list(dict.fromkeys(file_ids))
+        names: Dict[str, Optional[str]] = self.get_many(file_ids)
+        missing = [file_id for file_id in file_ids if file_id not in names]
+        if not missing:
+            return names
+
+        def retrieve(file_id):
+            try:
+                return file_id, client.files.retrieve(file_id).filename
+            except Exception as e:
+                print(f"⚠️  Could not retrieve file {file_id}: {e}")
+                return file_id, None
+
+        with ThreadPoolExecutor(max_workers=min(RESOLVE_WORKERS, len(missing))) as pool:
+            retrieved = dict(pool.map(retrieve, missing))
+        self.put_many({file_id: filename for file_id, filename in retrieved.items() if filename})
+        names.update(retrieved)
+        return names
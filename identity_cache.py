@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+IDENTITY_CACHE_FILE = "ado_identity_cache.db"
+# Resolved names rarely change; unknown users are retried sooner in case they were transient
+IDENTITY_TTL_SECONDS = 30 * 24 * 3600
+NEGATIVE_TTL_SECONDS = 24 * 3600
+
+class IdentityCache:
+    """Persistent SQLite cache of ADO identity GUID -> display name.
+
+    Unknown users are cached too (display_name NULL) with a shorter TTL so
+    that GUIDs ADO cannot resolve are not re-queried on every sync.
+    """
+
+    def __init__(self, db_path: str = IDENTITY_CACHE_FILE, ttl: float = IDENTITY_TTL_SECONDS,
+                 negative_ttl: float = NEGATIVE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS identities (
+                guid TEXT PRIMARY KEY,
+                display_name TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, guids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Return fresh cached entries keyed by lowercase GUID (None means a cached unknown user)"""
+        keys = list({guid.lower() for guid in guids})
+        now = time.time()
+        found = {}
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT guid, display_name, fetched_at FROM identities WHERE guid IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for guid, display_name, fetched_at in rows:
+                    ttl = self.ttl if display_name is not None else self.negative_ttl
+                    if now - fetched_at < ttl:
+                        found[guid] = display_name
+
+        return found
+
+    def put_many(self, identities: Dict[str, Optional[str]]) -> None:
+        """Store lookups; a None display name records a negative result"""
+        if not identities:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO identities (guid, display_name, fetched_at) VALUES (?, ?, ?)",
+                [(guid.lower(), display_name, now) for guid, display_name in identities.items()]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
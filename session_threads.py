@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+# Sessions idle longer than this lose their thread (seconds)
+SESSION_TTL = 30 * 60
+# Most sessions kept at once (least recently used are evicted first)
+MAX_SESSIONS = 1000
+
+class SessionThreads:
+    """Conversation threads keyed by client session ID.
+
+    Each session gets its own thread, so a run only re-reads that
+    session's history instead of every user's. A session's runs are
+    serialized on its own lock, which avoids "run already active" errors
+    when one client sends overlapping requests. Sessions idle for longer
+    than ttl (or beyond max_sessions) are evicted and their threads deleted.
+    """
+
+    def __init__(self, create_thread: Callable[[], str], delete_thread: Callable[[str], None],
+                 ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.create_thread = create_thread
+        self.delete_thread = delete_thread
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self) -> List[str]:
+        """Drop expired and overflowing sessions that are not running; returns their thread IDs"""
+        now = time.monotonic()
+        evicted = []
+        overflow = len(self._sessions) - self.max_sessions
+        for session_id, session in list(self._sessions.items()):
+            expired = now - session['last_used'] > self.ttl
+            if not expired and overflow <= 0:
+                break
+            if session['lock'].locked():
+                continue
+            del self._sessions[session_id]
+            overflow -= 1
+            if session['thread_id']:
+                evicted.append(session['thread_id'])
+        return evicted
+
+    def _delete(self, thread_ids: List[str]) -> None:
+        for thread_id in thread_ids:
+            try:
+                self.delete_thread(thread_id)
+            except Exception as e:
+                print(f"⚠️  Could not delete thread {thread_id}: {e}")
+
+    @contextmanager
+    def lease(self, session_id: str):
+        """Hold the session's thread (created on first use) for one run"""
+        with self._lock:
+            now = time.monotonic()
+            session = self._sessions.get(session_id)
+            evicted = []
+            # An expired session starts over rather than reviving its old (possibly reaped) thread
+            if session and now - session['last_used'] > self.ttl and not session['lock'].locked():
+                del self._sessions[session_id]
+                if session['thread_id']:
+                    evicted.append(session['thread_id'])
+                session = None
+            if session is None:
+                session = {'thread_id': None, 'lock': threading.Lock(), 'last_used': now}
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session['last_used'] = now
+            evicted.extend(self._evict())
+        self._delete(evicted)
+
+        with session['lock']:
+            if session['thread_id'] is None:
+                session['thread_id'] = self.create_thread()
+            try:
+                yield session['thread_id']
+            finally:
+                session['last_used'] = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
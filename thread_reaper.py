@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from openai import NotFoundError
+
+from wiki_catalog import WikiCatalog
+
+# Threads unused for this long are deleted (seconds)
+THREAD_TTL = 24 * 60 * 60
+# Pause between reaper passes (seconds) and the most threads deleted per pass
+REAP_INTERVAL = 10 * 60
+REAP_BATCH_SIZE = 50
+# Rate limit for threads.delete calls
+DELETES_PER_SECOND = 5
+# Failed deletes before a thread is dropped from the registry
+MAX_REAP_ATTEMPTS = 5
+
+class ThreadReaper:
+    """Deletes Assistants threads from the catalog's registry once they expire.
+
+    Every thread created for an answer is recorded with its owner endpoint
+    and last use. A background thread deletes the ones idle for longer than
+    ttl in batches of batch_size, paced at deletes_per_second, and keeps
+    going without waiting for the next interval while full batches remain.
+    Threads that are already gone count as reaped.
+    """
+
+    _shared: Dict[str, "ThreadReaper"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, client, catalog: WikiCatalog) -> "ThreadReaper":
+        """The process-wide reaper for catalog"""
+        with cls._shared_lock:
+            if catalog.db_path not in cls._shared:
+                cls._shared[catalog.db_path] = cls(client, catalog)
+            return cls._shared[catalog.db_path]
+
+    def __init__(self, client, catalog: WikiCatalog, ttl: float = THREAD_TTL,
+                 interval: float = REAP_INTERVAL, batch_size: int = REAP_BATCH_SIZE,
+                 deletes_per_second: float = DELETES_PER_SECOND):
+        self.client = client
+        self.catalog = catalog
+        self.ttl = ttl
+        self.interval = interval
+        self.batch_size = batch_size
+        self.deletes_per_second = deletes_per_second
+
+        self.stats = {
+            'passes': 0,
+            'reaped': 0,
+            'failed': 0,
+            'last_pass': None,
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start reaping in the background (once per process)"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="thread-reaper", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reap(self) -> int:
+        """Delete one batch of expired threads; returns how many were deleted"""
+        expired = self.catalog.idle_threads(time.time() - self.ttl, self.batch_size)
+        reaped = []
+        for thread_id in expired:
+            if self._stop.is_set():
+                break
+            try:
+                self.client.beta.threads.delete(thread_id)
+                reaped.append(thread_id)
+            except NotFoundError:
+                reaped.append(thread_id)
+            except Exception as e:
+                print(f"⚠️  Could not delete thread {thread_id}: {e}")
+                self.catalog.thread_reap_failed(thread_id, MAX_REAP_ATTEMPTS)
+                self.stats['failed'] += 1
+            self._stop.wait(1 / self.deletes_per_second)
+
+        self.catalog.forget_threads(reaped)
+        self.stats['reaped'] += len(reaped)
+        self.stats['passes'] += 1
+        self.stats['last_pass'] = time.time()
+        if reaped:
+            print(f"🧹 Reaped {len(reaped)} expired threads")
+        return len(reaped)
+
+    def metrics(self) -> Dict:
+        """Live threads (in total and per owner) and what the reaper has done"""
+        by_owner = self.catalog.thread_counts()
+        return dict(self.stats, live=sum(by_owner.values()), by_owner=by_owner)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                full_batch = self.reap() >= self.batch_size
+            except Exception as e:
+                print(f"⚠️  Thread reaper pass failed: {e}")
+                full_batch = False
+            if not full_batch:
+                self._stop.wait(self.interval)
@@ -0,0 +1,294 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Batch statuses after which the vector store does no more work on a batch
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "cancelled"}
+
+class VectorStoreUploader:
+    """Keeps several vector store file batches in flight at once.
+
+    Files are uploaded with files.create and attached with a non-blocking
+    file_batches.create, so a new batch can start while earlier ones are still
+    being indexed. A single scheduler thread polls every in-flight batch on one
+    interval (instead of one blocking poll per batch) and adapts the batch size
+    to the observed indexing time: fast batches grow, slow ones shrink.
+
+    Files that fail to upload or index (or whose batch could not be created)
+    are detached and re-queued on their own with exponential backoff, up to
+    max_retries times, so one bad file never costs a whole batch.
+
+    Items are tuples whose first element is the local file path or an
+    in-memory (filename, bytes) pair to upload instead; on_batch_done
+    is called from the scheduler thread with (items, file_batch, file_ids)
+    once those items are final: file_ids line up with items and are None
+    for files that still failed after their retries. file_batch is the last
+    batch the items were in (None if it could not be created).
+    """
+
+    def __init__(self, client, vector_store_id: str,
+                 on_batch_done: Optional[Callable[[List, object, List[str]], None]] = None,
+                 max_in_flight: int = 4, batch_size: int = 50, min_batch_size: int = 10,
+                 max_batch_size: int = 200, target_batch_seconds: float = 30,
+                 poll_interval: float = 2, max_linger: float = 5, upload_workers: int = 8,
+                 max_retries: int = 3, retry_backoff: float = 5):
+        self.client = client
+        self.vector_store_id = vector_store_id
+        self.on_batch_done = on_batch_done
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_batch_seconds = target_batch_seconds
+        self.poll_interval = poll_interval
+        self.max_linger = max_linger
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.stats = {
+            'batches': 0,
+            'files': 0,
+            'completed': 0,
+            'failed': 0,
+            'retried': 0,
+            'errors': 0,
+        }
+
+        # Queued entries are (item, attempt); retries wait in a heap of (ready_at, seq, item, attempt)
+        self._pending = deque()
+        self._retries = []
+        self._retry_seq = itertools.count()
+        self._oldest_pending = None
+        self._uploading = []   # futures resolving to (entries, file_batch, file_ids, failed, started)
+        self._indexing = {}    # batch id -> (entries, file_ids, started)
+        self._closing = False
+        self._condition = threading.Condition()
+        # Batch jobs and the file uploads inside them use separate pools so jobs never wait on themselves
+        self._batch_pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="vs-batch")
+        self._file_pool = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="vs-upload")
+        self._thread = threading.Thread(target=self._run, name="vs-scheduler", daemon=True)
+        self._thread.start()
+
+    def add(self, items: Iterable) -> None:
+        """Queue files for upload; batches start as soon as a slot and enough files are available"""
+        with self._condition:
+            for item in items:
+                if not self._pending:
+                    self._oldest_pending = time.monotonic()
+                self._pending.append((item, 0))
+            self._condition.notify_all()
+
+    def wait(self) -> Dict:
+        """Upload everything queued, wait until it is indexed and stop the scheduler"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._batch_pool.shutdown()
+        self._file_pool.shutdown()
+        return self.stats
+
+    def _wake(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def _in_flight(self) -> int:
+        return len(self._uploading) + len(self._indexing)
+
+    def _retry(self, entries: List) -> None:
+        """Queue failed entries again after a backoff that doubles with each attempt"""
+        now = time.monotonic()
+        with self._condition:
+            for item, attempt in entries:
+                ready_at = now + self.retry_backoff * 2 ** attempt
+                heapq.heappush(self._retries, (ready_at, next(self._retry_seq), item, attempt + 1))
+        self.stats['retried'] += len(entries)
+
+    def _next_batch(self) -> Optional[List]:
+        """Take the next batch off the queue if one should start now"""
+        with self._condition:
+            now = time.monotonic()
+            while self._retries and self._retries[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(self._retries)
+                if not self._pending:
+                    self._oldest_pending = now
+                self._pending.append((item, attempt))
+            if not self._pending or self._in_flight() >= self.max_in_flight:
+                return None
+            lingering = time.monotonic() - self._oldest_pending >= self.max_linger
+            if len(self._pending) < self.batch_size and not (self._closing or lingering):
+                return None
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._oldest_pending = time.monotonic()
+            return batch
+
+    def _upload_file(self, source):
+        """Upload a file path or an in-memory (filename, bytes) pair, returning (file_id, error)"""
+        try:
+            if isinstance(source, tuple):
+                return self.client.files.create(file=source, purpose="assistants").id, None
+            with open(source, "rb") as f:
+                return self.client.files.create(file=f, purpose="assistants").id, None
+        except Exception as e:
+            return None, e
+
+    def _delete_file(self, file_id: str, detach: bool = False) -> None:
+        """Remove an uploaded file (and its vector store attachment), ignoring errors"""
+        if detach:
+            try:
+                self.client.beta.vector_stores.files.delete(vector_store_id=self.vector_store_id, file_id=file_id)
+            except Exception:
+                pass
+        try:
+            self.client.files.delete(file_id)
+        except Exception:
+            pass
+
+    def _create_batch(self, entries: List):
+        """Upload a batch's files in parallel and attach them without waiting for indexing.
+
+        Only the files that uploaded go into the batch; the entries whose upload
+        failed are returned separately (file_batch is None if none uploaded).
+        """
+        results = list(self._file_pool.map(self._upload_file, [item[0] for item, _ in entries]))
+        failed = [entry for entry, (file_id, _) in zip(entries, results) if not file_id]
+        errors = [error for _, error in results if error]
+        if errors:
+            print(f"    ❌ {len(errors)} of {len(entries)} uploads failed: {errors[0]}")
+        entries = [entry for entry, (file_id, _) in zip(entries, results) if file_id]
+        file_ids = [file_id for file_id, _ in results if file_id]
+        if not file_ids:
+            return entries, None, file_ids, failed, time.monotonic()
+        try:
+            file_batch = self.client.beta.vector_stores.file_batches.create(
+                vector_store_id=self.vector_store_id,
+                file_ids=file_ids
+            )
+        except Exception:
+            # Don't leave orphaned uploads behind
+            for file_id in file_ids:
+                self._delete_file(file_id)
+            raise
+        return entries, file_batch, file_ids, failed, time.monotonic()
+
+    def _adapt_batch_size(self, seconds: float) -> None:
+        """Grow batches that index well under the target time, shrink ones that overrun it"""
+        if seconds < self.target_batch_seconds / 2:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5))
+        elif seconds > self.target_batch_seconds:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+    def _failed_file_ids(self, file_batch, file_ids: List[str]) -> set:
+        """IDs of the batch's files that did not index"""
+        if file_batch.status == 'completed' and not file_batch.file_counts.failed:
+            return set()
+        files = self.client.beta.vector_stores.file_batches
+        if file_batch.status == 'completed':
+            return {f.id for f in files.list_files(file_batch.id, vector_store_id=self.vector_store_id,
+                                                   filter='failed')}
+        # Failed or cancelled batches: anything not listed as completed is retried
+        completed = {f.id for f in files.list_files(file_batch.id, vector_store_id=self.vector_store_id,
+                                                    filter='completed')}
+        return set(file_ids) - completed
+
+    def _finish(self, entries: List, file_batch, file_ids: List[str]) -> None:
+        """Retry the batch's failed files and report the final ones"""
+        if file_batch is None:
+            self.stats['errors'] += 1
+            file_ids = [None] * len(entries)
+        else:
+            try:
+                failed_ids = self._failed_file_ids(file_batch, file_ids)
+            except Exception as e:
+                print(f"    ⚠️  Could not list failed files for batch {file_batch.id}: {e}")
+                failed_ids = set(file_ids)
+            for file_id in failed_ids:
+                self._delete_file(file_id, detach=True)
+            file_ids = [None if file_id in failed_ids else file_id for file_id in file_ids]
+
+        retry = [entry for entry, file_id in zip(entries, file_ids)
+                 if file_id is None and entry[1] < self.max_retries]
+        if retry:
+            print(f"    🔁 Retrying {len(retry)} failed files")
+            self._retry(retry)
+        done = [(entry[0], file_id) for entry, file_id in zip(entries, file_ids)
+                if file_id is not None or entry[1] >= self.max_retries]
+        self.stats['completed'] += sum(1 for _, file_id in done if file_id)
+        self.stats['failed'] += sum(1 for _, file_id in done if not file_id)
+        if not done:
+            return
+        items, file_ids = [item for item, _ in done], [file_id for _, file_id in done]
+        if self.on_batch_done:
+            try:
+                self.on_batch_done(items, file_batch, file_ids)
+            except Exception as e:
+                print(f"    ❌ Error handling finished batch: {e}")
+
+    def _tick(self) -> bool:
+        """Advance every batch one step; returns whether anything changed"""
+        changed = False
+
+        batch = self._next_batch()
+        while batch:
+            self.stats['batches'] += 1
+            self.stats['files'] += len(batch)
+            print(f"\n  📦 Batch {self.stats['batches']}: uploading {len(batch)} files "
+                  f"({self._in_flight() + 1} in flight)")
+            future = self._batch_pool.submit(self._create_batch, batch)
+            future.add_done_callback(lambda _: self._wake())
+            with self._condition:
+                self._uploading.append((future, batch))
+            changed = True
+            batch = self._next_batch()
+
+        # Batches whose files finished uploading move on to indexing
+        for future, entries in [entry for entry in self._uploading if entry[0].done()]:
+            with self._condition:
+                self._uploading.remove((future, entries))
+            changed = True
+            try:
+                entries, file_batch, file_ids, failed, started = future.result()
+            except Exception as e:
+                print(f"    ❌ Upload error: {e}")
+                self._finish(entries, None, [])
+                continue
+            if failed:
+                self._finish(failed, None, [])
+            if file_batch is not None:
+                self._indexing[file_batch.id] = (entries, file_ids, started)
+
+        # One status call per indexing batch per interval
+        for batch_id, (entries, file_ids, started) in list(self._indexing.items()):
+            try:
+                file_batch = self.client.beta.vector_stores.file_batches.retrieve(
+                    batch_id, vector_store_id=self.vector_store_id
+                )
+            except Exception as e:
+                print(f"    ⚠️  Could not poll batch {batch_id}: {e}")
+                continue
+            if file_batch.status not in TERMINAL_BATCH_STATUSES:
+                continue
+
+            seconds = time.monotonic() - started
+            del self._indexing[batch_id]
+            self._adapt_batch_size(seconds)
+            print(f"    ✅ Batch {batch_id}: {file_batch.status} in {seconds:.1f}s "
+                  f"(completed: {file_batch.file_counts.completed}, failed: {file_batch.file_counts.failed}) "
+                  f"| next batch size: {self.batch_size}")
+            self._finish(entries, file_batch, file_ids)
+            changed = True
+
+        return changed
+
+    def _run(self) -> None:
+        while True:
+            changed = self._tick()
+            with self._condition:
+                if self._closing and not self._pending and not self._retries and not self._in_flight():
+                    return
+                if not changed:
+                    self._condition.wait(self.poll_interval)
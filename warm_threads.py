@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# Empty threads kept ready per pool
+WARM_THREADS = 4
+# Ready threads older than this are replaced rather than leased, well before the reaper's TTL (seconds)
+WARM_THREAD_MAX_AGE = 6 * 60 * 60
+# Registry owner of threads still waiting in the pool
+POOL_OWNER = "warm-pool"
+
+class WarmThreadPool:
+    """Empty threads with a vector store already attached, ready to lease.
+
+    lease() hands out a pre-created thread without an API round trip (or
+    creates one if the pool is empty). Once warm() has been called (the web
+    servers do at startup) the pool refills in the background; until then,
+    e.g. for a one-off CLI question, leases just create the thread they need.
+    Threads are created for one vector store at a time; leasing
+    for a different store drops the ones made for the old store.
+
+    With a registry (the WikiCatalog), created threads are recorded under
+    POOL_OWNER and handed to the leasing owner, so the reaper can clean up
+    after them.
+    """
+
+    def __init__(self, client, size: int = WARM_THREADS, registry=None,
+                 max_age: float = WARM_THREAD_MAX_AGE):
+        self.client = client
+        self.size = size
+        self.registry = registry
+        self.max_age = max_age
+        self.vector_store_id: Optional[str] = None
+        self._ready = deque()
+        self._warm = False
+        self._filling = False
+        self._lock = threading.Lock()
+        self._refill_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-threads")
+
+    def _create(self, vector_store_id: str, owner: str = POOL_OWNER) -> str:
+        thread = self.client.beta.threads.create(
+            tool_resources={
+                "file_search": {
+                    "vector_store_ids": [vector_store_id]
+                }
+            }
+        )
+        if self.registry is not None:
+            self.registry.record_thread(thread.id, owner)
+        return thread.id
+
+    def _switch(self, vector_store_id: str) -> list:
+        """Point the pool at vector_store_id (caller holds the lock); returns the stale threads"""
+        if vector_store_id == self.vector_store_id:
+            return []
+        stale = [thread_id for thread_id, _ in self._ready]
+        self._ready.clear()
+        self.vector_store_id = vector_store_id
+        return stale
+
+    def _discard(self, thread_ids: list) -> None:
+        """Delete unleased threads (the reaper retries any that fail)"""
+        deleted = []
+        for thread_id in thread_ids:
+            try:
+                self.client.beta.threads.delete(thread_id)
+                deleted.append(thread_id)
+            except Exception:
+                pass
+        if self.registry is not None and deleted:
+            self.registry.forget_threads(deleted)
+
+    def _refill(self) -> None:
+        while True:
+            with self._lock:
+                vector_store_id = self.vector_store_id
+                # Checked and cleared under the lock so a lease never misses a refill
+                if len(self._ready) >= self.size or not vector_store_id:
+                    self._filling = False
+                    return
+            try:
+                thread_id = self._create(vector_store_id)
+            except Exception as e:
+                print(f"⚠️  Could not pre-create thread: {e}")
+                with self._lock:
+                    self._filling = False
+                return
+            with self._lock:
+                if vector_store_id == self.vector_store_id:
+                    self._ready.append((thread_id, time.monotonic()))
+                    continue
+            self._discard([thread_id])
+
+    def _schedule_refill(self) -> None:
+        with self._lock:
+            if self._filling:
+                return
+            self._filling = True
+        self._refill_pool.submit(self._refill)
+
+    def warm(self, vector_store_id: str) -> None:
+        """Start filling the pool for vector_store_id and keep it filled from now on"""
+        with self._lock:
+            self._warm = True
+            stale = self._switch(vector_store_id)
+        self._discard(stale)
+        self._schedule_refill()
+
+    def lease(self, vector_store_id: str, owner: str = POOL_OWNER) -> str:
+        """A thread attached to vector_store_id for owner, from the pool when one is ready"""
+        thread_id = None
+        with self._lock:
+            stale = self._switch(vector_store_id)
+            while self._ready and thread_id is None:
+                thread_id, created = self._ready.popleft()
+                if time.monotonic() - created > self.max_age:
+                    stale.append(thread_id)
+                    thread_id = None
+            warm = self._warm
+        self._discard(stale)
+        if warm:
+            self._schedule_refill()
+        if thread_id is None:
+            return self._create(vector_store_id, owner)
+        if self.registry is not None:
+            self.registry.touch_thread(thread_id, owner)
+        return thread_id
+
+    def __len__(self) -> int:
+        return len(self._ready)
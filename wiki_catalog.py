@@ -0,0 +1,555 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CATALOG_FILE = "wiki_catalog.db"
+# Upper bound on how much of the database file is memory-mapped
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Resource names (assistant and vector store IDs)
+VECTOR_STORE = "vector_store_id"
+ASSISTANT = "assistant_id"
+TEST_VECTOR_STORE = "test_vector_store_id"
+TEST_ASSISTANT = "test_assistant_id"
+
+# JSON state files the catalog replaces: resource name -> (file, key)
+LEGACY_RESOURCE_FILES = {
+    VECTOR_STORE: ("vector_store_id.json", "vector_store_id"),
+    ASSISTANT: ("assistant_id.json", "assistant_id"),
+    TEST_VECTOR_STORE: ("test_vector_store_id.json", "vector_store_id"),
+    TEST_ASSISTANT: ("test_assistant_id.json", "assistant_id"),
+}
+LEGACY_UPLOADS_FILE = "uploaded_files.json"
+LEGACY_URL_MAPPING_FILE = "wiki_url_mapping.json"
+LEGACY_PROGRESS_FILE = "download_progress.json"
+PAGE_LINK_PREFIX = "[View this page online]("
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hash TEXT,
+    version TEXT,
+    PRIMARY KEY (root, path)
+);
+CREATE TABLE IF NOT EXISTS downloads (
+    root TEXT PRIMARY KEY,
+    meta TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    path TEXT PRIMARY KEY,
+    hash TEXT,
+    file_id TEXT,
+    alias_of TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_by_file_id ON uploads (file_id);
+CREATE INDEX IF NOT EXISTS uploads_by_alias ON uploads (alias_of);
+CREATE TABLE IF NOT EXISTS url_mappings (
+    filename TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    lookup_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS url_mappings_by_key ON url_mappings (lookup_key);
+CREATE TABLE IF NOT EXISTS file_names (
+    file_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS file_names_by_use ON file_names (last_used);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    reap_attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS threads_by_use ON threads (last_used);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    source TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+def _file_signature(path: str) -> Optional[str]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def _write_json(path: str, data) -> None:
+    """Replace a JSON file atomically"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def url_lookup_key(filename: str) -> str:
+    """Normalized mapping key: extension-less and case-folded"""
+    if filename.lower().endswith('.md'):
+        filename = filename[:-3]
+    return filename.casefold()
+
+def _link_url(value: str) -> str:
+    """URL of a '[View this page online](url)' mapping value (other values are kept as is)"""
+    if value.startswith(PAGE_LINK_PREFIX) and value.endswith(')'):
+        return value[len(PAGE_LINK_PREFIX):-1]
+    return value
+
+class WikiCatalog:
+    """Local SQLite catalog of the ingest state.
+
+    Holds the assistant/vector store IDs (resources), the download progress
+    per wiki directory (pages), the vector store manifest (uploads), the
+    page URL mapping (url_mappings) and the Assistants threads created for
+    answers (threads), replacing the JSON files that used to be
+    loaded and rewritten in full on every use. Saves only write the rows that
+    changed since the last load or save, in one transaction.
+
+    The JSON files seed a newly created catalog, so existing checkouts and
+    deployments keep working; after that the catalog is the source of truth.
+    Git-based deploys ship the JSON files rather than the (gitignored)
+    catalog, so export_json() writes the resource IDs and the URL mapping
+    back out as an explicit step before a deploy.
+
+    Use WikiCatalog.shared() to reuse one connection per database within a
+    process; the database file is memory-mapped, so lookups read straight
+    from the OS page cache.
+    """
+
+    _shared: Dict[str, "WikiCatalog"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db_path: str = CATALOG_FILE, legacy_dir: str = ".") -> "WikiCatalog":
+        """The process-wide catalog for db_path"""
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(db_path, legacy_dir)
+            return cls._shared[key]
+
+    def __init__(self, db_path: str = CATALOG_FILE, legacy_dir: str = "."):
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        self._lock = threading.RLock()
+        self._saved_uploads: Dict[str, str] = {}
+        self._saved_urls: Dict[str, str] = {}
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        created = not os.path.exists(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        if created:
+            self._import_legacy_files()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Legacy JSON import ---
+
+    def _legacy_pending(self, source: str) -> Optional[str]:
+        """Signature of a legacy file that was never imported (None if absent or already imported).
+
+        Each file is imported once: later edits (e.g. a git checkout of an old
+        copy) must not overwrite the newer state kept in the catalog.
+        """
+        signature = _file_signature(source)
+        if signature is None:
+            return None
+        row = self._conn.execute("SELECT 1 FROM legacy_imports WHERE source = ?",
+                                 (os.path.abspath(source),)).fetchone()
+        return None if row else signature
+
+    def _mark_imported(self, source: str, signature: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO legacy_imports (source, signature) VALUES (?, ?)",
+                           (os.path.abspath(source), signature))
+
+    def _load_legacy_json(self, path: str):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️  Could not import {path}: {e}")
+            return None
+
+    def _import_legacy_files(self) -> None:
+        """Seed a new catalog from the JSON files it replaces"""
+        with self._lock, self._conn:
+            for name, (filename, key) in LEGACY_RESOURCE_FILES.items():
+                path = os.path.join(self.legacy_dir, filename)
+                signature = self._legacy_pending(path)
+                if signature is None:
+                    continue
+                data = self._load_legacy_json(path)
+                if isinstance(data, dict) and data.get(key):
+                    self._set_resource(name, data[key])
+                self._mark_imported(path, signature)
+
+            path = os.path.join(self.legacy_dir, LEGACY_UPLOADS_FILE)
+            signature = self._legacy_pending(path)
+            if signature is not None:
+                data = self._load_legacy_json(path) or {}
+                # Older logs only stored the hash; their file IDs are unknown
+                self._write_uploads({
+                    rel: entry if isinstance(entry, dict)
+                    else {'hash': entry, 'file_id': None, 'vector_store_file_id': None}
+                    for rel, entry in data.items()
+                }, [])
+                self._mark_imported(path, signature)
+                if data:
+                    print(f"📋 Imported {len(data)} uploaded files from {LEGACY_UPLOADS_FILE}")
+
+            path = os.path.join(self.legacy_dir, LEGACY_URL_MAPPING_FILE)
+            signature = self._legacy_pending(path)
+            if signature is not None:
+                data = self._load_legacy_json(path) or {}
+                self._write_urls({filename: _link_url(value) for filename, value in data.items()}, [])
+                self._mark_imported(path, signature)
+                if data:
+                    print(f"📋 Imported {len(data)} wiki URL mappings from {LEGACY_URL_MAPPING_FILE}")
+
+    # --- Resources ---
+
+    def get_resource(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM resources WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_resource(self, name: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO resources (name, value, updated_at) VALUES (?, ?, ?)",
+            (name, value, time.time())
+        )
+
+    def set_resource(self, name: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._set_resource(name, value)
+
+    def delete_resource(self, name: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM resources WHERE name = ?", (name,))
+
+    # --- JSON export ---
+
+    def export_json(self) -> List[str]:
+        """Write the resource IDs and the URL mapping to the JSON files deploys ship; returns the paths written"""
+        with self._lock:
+            resources = dict(self._conn.execute("SELECT name, value FROM resources").fetchall())
+            mapping = dict(self._conn.execute("SELECT filename, url FROM url_mappings ORDER BY filename").fetchall())
+        written = []
+        for name, (filename, key) in LEGACY_RESOURCE_FILES.items():
+            path = os.path.join(self.legacy_dir, filename)
+            if resources.get(name):
+                _write_json(path, {key: resources[name]})
+                written.append(path)
+            elif os.path.exists(path):
+                os.remove(path)
+        path = os.path.join(self.legacy_dir, LEGACY_URL_MAPPING_FILE)
+        _write_json(path, {filename: f"{PAGE_LINK_PREFIX}{url})" for filename, url in mapping.items()})
+        written.append(path)
+        return written
+
+    # --- Vector store manifest ---
+
+    def _write_uploads(self, changed: Dict[str, Dict], removed: Iterable[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO uploads (path, hash, file_id, alias_of, entry) VALUES (?, ?, ?, ?, ?)",
+            [(rel, entry.get('hash'), entry.get('file_id'), entry.get('alias_of'), json.dumps(entry))
+             for rel, entry in changed.items()]
+        )
+        self._conn.executemany("DELETE FROM uploads WHERE path = ?", [(rel,) for rel in removed])
+
+    def load_uploads(self) -> Dict[str, Dict]:
+        """The vector store manifest: relative path -> entry"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, entry FROM uploads").fetchall()
+            self._saved_uploads = dict(rows)
+        return {rel: json.loads(entry) for rel, entry in rows}
+
+    def save_uploads(self, uploads: Dict[str, Dict]) -> None:
+        """Write the entries that changed since the last load/save and drop the ones removed"""
+        # Snapshot first: pipeline mode adds entries from more than one thread
+        serialized = {rel: json.dumps(entry) for rel, entry in list(uploads.items())}
+        with self._lock, self._conn:
+            changed = {rel: json.loads(text) for rel, text in serialized.items()
+                       if self._saved_uploads.get(rel) != text}
+            removed = [rel for rel in self._saved_uploads if rel not in serialized]
+            self._write_uploads(changed, removed)
+            self._saved_uploads = serialized
+
+    def clear_uploads(self) -> None:
+        """Forget the manifest (the vector store it described is gone)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads")
+            self._saved_uploads = {}
+
+    def upload_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+    def aliases(self) -> List[Tuple[str, str, Dict]]:
+        """(path, canonical path, entry) for every page recorded as a duplicate"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, alias_of, entry FROM uploads WHERE alias_of IS NOT NULL ORDER BY path"
+            ).fetchall()
+        return [(rel, alias_of, json.loads(entry)) for rel, alias_of, entry in rows]
+
+    # --- Page URL mapping ---
+
+    def _write_urls(self, changed: Dict[str, str], removed: Iterable[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO url_mappings (filename, url, lookup_key) VALUES (?, ?, ?)",
+            [(name, url, url_lookup_key(name)) for name, url in changed.items()]
+        )
+        self._conn.executemany("DELETE FROM url_mappings WHERE filename = ?", [(name,) for name in removed])
+
+    def load_url_mappings(self) -> Dict[str, str]:
+        """Uploaded filename -> public wiki URL"""
+        with self._lock:
+            self._saved_urls = dict(self._conn.execute("SELECT filename, url FROM url_mappings").fetchall())
+            return dict(self._saved_urls)
+
+    def public_url(self, filename: str) -> Optional[str]:
+        """URL for an uploaded filename: exact match first, then by normalized key"""
+        with self._lock:
+            row = self._conn.execute("SELECT url FROM url_mappings WHERE filename = ?", (filename,)).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT url FROM url_mappings WHERE lookup_key = ? ORDER BY filename LIMIT 1",
+                    (url_lookup_key(filename),)
+                ).fetchone()
+        return row[0] if row else None
+
+    def save_url_mappings(self, mapping: Dict[str, str]) -> None:
+        """Write the mappings that changed since the last load/save and drop the ones removed"""
+        snapshot = dict(mapping)
+        with self._lock, self._conn:
+            changed = {name: url for name, url in snapshot.items() if self._saved_urls.get(name) != url}
+            removed = [name for name in self._saved_urls if name not in snapshot]
+            self._write_urls(changed, removed)
+            self._saved_urls = snapshot
+
+    # --- Uploaded file names ---
+
+    def get_file_names(self, file_ids: Iterable[str]) -> Dict[str, str]:
+        """Filenames of the known file IDs, marking them as recently used"""
+        keys = list(set(file_ids))
+        found = {}
+        with self._lock, self._conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT file_id, filename FROM file_names WHERE file_id IN ({placeholders})", chunk
+                ).fetchall())
+            now = time.time()
+            self._conn.executemany("UPDATE file_names SET last_used = ? WHERE file_id = ?",
+                                   [(now, file_id) for file_id in found])
+        return found
+
+    def put_file_names(self, file_names: Dict[str, str], max_entries: int) -> None:
+        """Remember file ID -> filename, evicting the least recently used beyond max_entries"""
+        if not file_names:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_names (file_id, filename, last_used) VALUES (?, ?, ?)",
+                [(file_id, filename, now) for file_id, filename in file_names.items()]
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM file_names").fetchone()[0] - max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM file_names WHERE file_id IN "
+                    "(SELECT file_id FROM file_names ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+    # --- Assistants threads ---
+
+    def record_thread(self, thread_id: str, owner: str) -> None:
+        """Register a newly created thread"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, owner, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (thread_id, owner, now, now)
+            )
+
+    def touch_thread(self, thread_id: str, owner: Optional[str] = None) -> None:
+        """Mark a thread as used now (and hand it to owner)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE threads SET last_used = ?, owner = COALESCE(?, owner) WHERE thread_id = ?",
+                (time.time(), owner, thread_id)
+            )
+
+    def forget_threads(self, thread_ids: Iterable[str]) -> None:
+        """Drop deleted threads from the registry"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM threads WHERE thread_id = ?",
+                                   [(thread_id,) for thread_id in thread_ids])
+
+    def idle_threads(self, before: float, limit: int) -> List[str]:
+        """Threads last used before the given time, fewest failed deletes and oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id FROM threads WHERE last_used < ? ORDER BY reap_attempts, last_used LIMIT ?",
+                (before, limit)
+            ).fetchall()
+        return [thread_id for thread_id, in rows]
+
+    def thread_reap_failed(self, thread_id: str, max_attempts: int) -> None:
+        """Count a failed delete, giving up on the thread after max_attempts"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE threads SET reap_attempts = reap_attempts + 1 WHERE thread_id = ?",
+                               (thread_id,))
+            self._conn.execute("DELETE FROM threads WHERE thread_id = ? AND reap_attempts >= ?",
+                               (thread_id, max_attempts))
+
+    def thread_counts(self) -> Dict[str, int]:
+        """Registered threads per owner"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT owner, COUNT(*) FROM threads GROUP BY owner").fetchall())
+
+    def forget_file_names(self, file_ids: Iterable[str]) -> None:
+        """Drop the filenames of files that were removed from the vector store"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM file_names WHERE file_id = ?", [(file_id,) for file_id in file_ids])
+
+    # --- Download progress ---
+
+    def download_progress(self, save_dir: str) -> "DownloadProgress":
+        return DownloadProgress(self, save_dir)
+
+
+class DownloadProgress:
+    """Downloaded wiki pages of one directory, kept in the catalog's pages table.
+
+    Every record/remove is a single-row transaction, so a crash loses at most
+    the page being written. A download_progress.json left in the directory is
+    imported on first use.
+    """
+
+    def __init__(self, catalog: WikiCatalog, save_dir: str):
+        self.catalog = catalog
+        self.save_dir = save_dir
+        # Absolute, so the same directory keeps its progress from any working directory
+        self.root = os.path.abspath(save_dir)
+        self.path = catalog.db_path
+        self.entries: Dict[str, Dict] = {}
+        self.meta: Dict = {}
+        self._import_legacy()
+        self.load()
+
+    @property
+    def _conn(self):
+        return self.catalog._conn
+
+    def exists(self) -> bool:
+        """Whether any progress has been recorded"""
+        return bool(self.entries) or bool(self.meta)
+
+    def load(self) -> None:
+        with self.catalog._lock:
+            rows = self._conn.execute("SELECT path, hash, version FROM pages WHERE root = ?",
+                                      (self.root,)).fetchall()
+            meta = self._conn.execute("SELECT meta FROM downloads WHERE root = ?", (self.root,)).fetchone()
+        self.entries = {path: {'hash': content_hash, 'version': version} for path, content_hash, version in rows}
+        self.meta = json.loads(meta[0]) if meta else {}
+
+    def _import_legacy(self) -> None:
+        """Import a legacy download_progress.json from the download directory"""
+        path = os.path.join(self.save_dir, LEGACY_PROGRESS_FILE)
+        with self.catalog._lock:
+            signature = self.catalog._legacy_pending(path)
+        if signature is None:
+            return
+        if self._has_progress():
+            # The catalog already tracks this directory; don't roll it back to an old file
+            with self.catalog._lock, self._conn:
+                self.catalog._mark_imported(path, signature)
+            return
+
+        data = self.catalog._load_legacy_json(path) or {}
+        versions = data.get('page_versions', {})
+        entries = {page: {'hash': content_hash, 'version': versions.get(page)}
+                   for page, content_hash in data.get('downloaded_files', {}).items()}
+        meta = {key: value for key, value in data.items() if key not in ('downloaded_files', 'page_versions')}
+
+        self._replace(entries, meta)
+        with self.catalog._lock, self._conn:
+            self.catalog._mark_imported(path, signature)
+        print(f"📋 Imported {len(entries)} entries from {LEGACY_PROGRESS_FILE}")
+
+    def _has_progress(self) -> bool:
+        with self.catalog._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM downloads WHERE root = ? UNION SELECT 1 FROM pages WHERE root = ? LIMIT 1",
+                (self.root, self.root)
+            ).fetchone() is not None
+
+    def hashes(self) -> Dict[str, str]:
+        """Content hash per tracked page path"""
+        return {path: entry['hash'] for path, entry in self.entries.items()}
+
+    def versions(self) -> Dict[str, str]:
+        """ADO git object ID per tracked page path (pages without one are omitted)"""
+        return {path: entry['version'] for path, entry in self.entries.items() if entry.get('version')}
+
+    def record(self, path: str, content_hash: str, version: Optional[str] = None) -> None:
+        """Record a downloaded page"""
+        self.entries[path] = {'hash': content_hash, 'version': version}
+        with self.catalog._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (root, path, hash, version) VALUES (?, ?, ?, ?)",
+                (self.root, path, content_hash, version)
+            )
+
+    def remove(self, path: str) -> None:
+        """Stop tracking a page"""
+        if self.entries.pop(path, None) is not None:
+            with self.catalog._lock, self._conn:
+                self._conn.execute("DELETE FROM pages WHERE root = ? AND path = ?", (self.root, path))
+
+    def update_meta(self, **meta) -> None:
+        """Record sync metadata such as last_updated, completed or last_session_stats"""
+        meta.setdefault('last_updated', time.time())
+        self.meta.update(meta)
+        with self.catalog._lock, self._conn:
+            self._write_meta()
+
+    def _write_meta(self) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO downloads (root, meta) VALUES (?, ?)",
+                           (self.root, json.dumps(self.meta, ensure_ascii=False)))
+
+    def _replace(self, entries: Dict[str, Dict], meta: Dict) -> None:
+        self.entries = dict(entries)
+        self.meta = dict(meta)
+        with self.catalog._lock, self._conn:
+            self._conn.execute("DELETE FROM pages WHERE root = ?", (self.root,))
+            self._conn.executemany(
+                "INSERT INTO pages (root, path, hash, version) VALUES (?, ?, ?, ?)",
+                [(self.root, path, entry.get('hash'), entry.get('version')) for path, entry in self.entries.items()]
+            )
+            self._write_meta()
+
+    def rewrite(self, entries: Dict[str, Dict], **meta) -> None:
+        """Replace all tracked entries and metadata in one transaction"""
+        self._replace(entries, meta)
@@ -0,0 +1,129 @@
+import hashlib
+import re
+import zlib
+from typing import Callable, Dict, List, Optional, Set
+
+# Signature size and LSH banding: 8 bands of 4 rows catch pairs above ~0.6 Jaccard.
+# 32 bins only estimate similarity to within a few percent, so candidates estimated
+# above CANDIDATE_THRESHOLD are confirmed with their exact shingle Jaccard against
+# NEAR_DUPLICATE_THRESHOLD before a page is aliased
+MINHASH_BINS = 32
+LSH_BANDS = 8
+CANDIDATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_THRESHOLD = 0.95
+SHINGLE_SIZE = 5
+# Shorter pages (e.g. near-empty templates) are only deduplicated on exact matches
+MIN_NEAR_DUPLICATE_WORDS = 50
+
+PAGE_LINK_PATTERN = re.compile(r'^\[View this page online\]\([^)]*\)\s*')
+WORD_PATTERN = re.compile(r'\w+')
+EMPTY_BIN = 0xFFFFFFFF
+
+def normalize(content: str) -> str:
+    """Page text without its online link header, case or whitespace differences"""
+    content = PAGE_LINK_PATTERN.sub('', content, count=1)
+    return ' '.join(content.lower().split())
+
+def content_hash(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def shingles(normalized: str) -> Set[int]:
+    """Hashes of the text's word shingles"""
+    words = WORD_PATTERN.findall(normalized)
+    return {zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+            for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+
+def minhash(normalized: str) -> str:
+    """One-permutation MinHash of word shingles, as a hex string of MINHASH_BINS 32-bit minima.
+
+    Each shingle is hashed once and kept as the minimum of its bin, which
+    costs one hash per shingle instead of one per shingle per permutation.
+    """
+    bins = [EMPTY_BIN] * MINHASH_BINS
+    for value in shingles(normalized):
+        index = value % MINHASH_BINS
+        if value < bins[index]:
+            bins[index] = value
+    return ''.join(f"{value:08x}" for value in bins)
+
+def jaccard(shingles_a: Set[int], shingles_b: Set[int]) -> float:
+    """Exact Jaccard similarity of two shingle sets"""
+    union = len(shingles_a | shingles_b)
+    return len(shingles_a & shingles_b) / union if union else 1.0
+
+def similarity(signature_a: str, signature_b: str) -> float:
+    """Estimated Jaccard similarity of two signatures (bins empty in both are ignored)"""
+    matches = compared = 0
+    for i in range(0, MINHASH_BINS * 8, 8):
+        a, b = signature_a[i:i + 8], signature_b[i:i + 8]
+        if a == b == f"{EMPTY_BIN:08x}":
+            continue
+        compared += 1
+        matches += a == b
+    return matches / compared if compared else 1.0
+
+def fingerprint(content: str) -> Dict[str, Optional[str]]:
+    """Dedup fingerprint of a page: {'content_hash', 'minhash'} (minhash None for short pages)"""
+    normalized = normalize(content)
+    signature = None
+    if len(WORD_PATTERN.findall(normalized)) >= MIN_NEAR_DUPLICATE_WORDS:
+        signature = minhash(normalized)
+    return {'content_hash': content_hash(normalized), 'minhash': signature}
+
+class DuplicateIndex:
+    """Finds exact (normalized hash) and near-exact (MinHash/LSH) duplicates among canonical pages.
+
+    load_content(key) returns a canonical page's text; near-duplicate
+    candidates are only accepted once their exact shingle Jaccard reaches
+    the threshold (without it, the MinHash estimate decides).
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                 load_content: Optional[Callable[[str], Optional[str]]] = None):
+        self.threshold = threshold
+        self.load_content = load_content
+        self.by_hash: Dict[str, str] = {}
+        self.signatures: Dict[str, str] = {}
+        self.buckets: Dict[tuple, List[str]] = {}
+
+    def _bands(self, signature: str):
+        width = len(signature) // LSH_BANDS
+        for band in range(LSH_BANDS):
+            value = signature[band * width:(band + 1) * width]
+            # Bands of empty bins would make every short page a candidate
+            if value.strip('f'):
+                yield band, value
+
+    def add(self, key: str, fingerprint: Dict[str, str]) -> None:
+        """Register a canonical page"""
+        self.by_hash.setdefault(fingerprint['content_hash'], key)
+        if not fingerprint.get('minhash'):
+            return
+        self.signatures[key] = fingerprint['minhash']
+        for band in self._bands(fingerprint['minhash']):
+            self.buckets.setdefault(band, []).append(key)
+
+    def _confirmed(self, key: str, page_shingles: Set[int]) -> bool:
+        content = self.load_content(key)
+        return content is not None and jaccard(page_shingles, shingles(normalize(content))) >= self.threshold
+
+    def find(self, fingerprint: Dict[str, str], content: Optional[str] = None) -> Optional[str]:
+        """Canonical page this fingerprint (of content) duplicates, if any"""
+        exact = self.by_hash.get(fingerprint['content_hash'])
+        if exact is not None or not fingerprint.get('minhash'):
+            return exact
+
+        confirm = self.load_content is not None and content is not None
+        floor = CANDIDATE_THRESHOLD if confirm else self.threshold
+        candidates = {key for band in self._bands(fingerprint['minhash']) for key in self.buckets.get(band, [])}
+        scored = sorted(((similarity(fingerprint['minhash'], self.signatures[key]), key) for key in candidates),
+                        reverse=True)
+        scored = [(score, key) for score, key in scored if score >= floor]
+        if not confirm:
+            return scored[0][1] if scored else None
+
+        page_shingles = shingles(normalize(content))
+        for _, key in scored:
+            if self._confirmed(key, page_shingles):
+                return key
+        return None
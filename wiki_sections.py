@@ -0,0 +1,116 @@
+import re
+from typing import Dict, List, Optional
+
+# Pages smaller than this (in bytes) are uploaded whole
+SECTION_SPLIT_THRESHOLD = 12000
+# Upper bound for one section document's body
+MAX_SECTION_CHARS = 8000
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+PAGE_LINK_PATTERN = re.compile(r'^\[View this page online\]\(([^)]*)\)\s*\n\n?')
+
+def heading_anchor(title: str) -> str:
+    """ADO wiki anchor for a heading: lowercase, punctuation dropped, spaces as hyphens"""
+    anchor = re.sub(r'[^\w\s-]', '', title.strip().lower())
+    return re.sub(r'\s+', '-', anchor)
+
+def split_page_link(content: str):
+    """Return (page_url, body) for a downloaded page; page_url is None without the online link header"""
+    match = PAGE_LINK_PATTERN.match(content)
+    if not match:
+        return None, content
+    return match.group(1), content[match.end():]
+
+def _parse_sections(body: str) -> List[Dict]:
+    """Split markdown at headings (ignoring fenced code), tracking each section's heading path"""
+    sections = [{'level': 0, 'title': None, 'path': [], 'lines': []}]
+    stack = []  # (level, title) of the open headings
+    in_fence = False
+
+    for line in body.splitlines(keepends=True):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            level, title = len(match.group(1)), match.group(2)
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, title))
+            sections.append({'level': level, 'title': title, 'path': [t for _, t in stack], 'lines': []})
+        sections[-1]['lines'].append(line)
+
+    return [section for section in sections if ''.join(section['lines']).strip()]
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """Break text at paragraph boundaries (or hard limits) into pieces of at most max_chars"""
+    pieces = []
+    current = ""
+    for paragraph in re.split(r'(?<=\n\n)', text):
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if len(current) + len(paragraph) > max_chars and current:
+            pieces.append(current)
+            current = ""
+        current += paragraph
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+def split_sections(body: str, max_chars: int = MAX_SECTION_CHARS) -> List[Dict]:
+    """Split a markdown page into bounded section documents along its heading hierarchy.
+
+    Each document starts at a heading and takes as many of its subsections as
+    fit in max_chars; oversized sections are split at paragraph boundaries.
+    Returns [{'title', 'path', 'anchor', 'text'}], title/anchor None for text
+    before the first heading.
+    """
+    documents = []
+    current = None
+
+    for section in _parse_sections(body):
+        text = ''.join(section['lines'])
+        # A heading at or above the document's own level starts a new document (as does the first heading)
+        fits = (current is not None and current['title'] is not None and section['level'] > current['level']
+                and len(current['text']) + len(text) <= max_chars)
+        if fits:
+            current['text'] += text
+            continue
+
+        if current is not None:
+            documents.append(current)
+        current = {
+            'level': section['level'],
+            'title': section['title'],
+            'path': section['path'],
+            'anchor': heading_anchor(section['title']) if section['title'] else None,
+            'text': text,
+        }
+        if len(text) > max_chars:
+            pieces = _split_oversized(text, max_chars)
+            for piece in pieces[:-1]:
+                documents.append(dict(current, text=piece))
+            current['text'] = pieces[-1]
+
+    if current is not None:
+        documents.append(current)
+
+    for document in documents:
+        del document['level']
+    return documents
+
+def section_filename(page_filename: str, title: Optional[str], used: set) -> str:
+    """Unique upload filename for a section of page_filename, e.g. 'Runbook § Rollback.md'"""
+    stem = page_filename[:-3] if page_filename.endswith('.md') else page_filename
+    label = re.sub(r'[\\/:*?"<>|#]', '', title).strip() if title else "Overview"
+    name = f"{stem} § {label}.md"
+    counter = 2
+    while name in used:
+        name = f"{stem} § {label} ({counter}).md"
+        counter += 1
+    used.add(name)
+    return name